@@ -0,0 +1,95 @@
+"""
+Aggregate Feeds
+Sammel-Feeds über mehrere Kategorien (je Feld und über alle Felder). Die Ranglisten der
+einzelnen Feeds werden per k-Wege-Merge (heapq.merge) nach Score zusammengeführt und
+nach DOI dedupliziert; die Items selbst stammen aus den Einzel-Feeds desselben Laufs.
+"""
+
+import heapq
+from collections import OrderedDict
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from feed_state import EntryKey
+from text_normalization import feed_slug, slugify
+
+AGGREGATE_SLUG = "all_categories"
+DEFAULT_AGGREGATE_MAX_ITEMS = 100
+
+
+class AggregateSpec(NamedTuple):
+    name: str
+    slug: str
+    field: Optional[str] # None für den Feed über alle Felder
+    members: Tuple[Tuple[str, str], ...] # (Feed-Name ohne Endung, Anzeigename) der enthaltenen Feeds
+
+
+def aggregate_specs(categories: Sequence[Tuple[str, str, Optional[str]]]) -> List[AggregateSpec]:
+    """
+    Sammel-Feeds für die Kategorien (Form wie bei run): einer über alle Kategorien und je Feld
+    einer, sofern das Feld mehrere Kategorien hat. Gibt es nur ein Feld, entspräche dessen
+    Sammel-Feed dem Feed über alle Kategorien und entfällt.
+    """
+    members_by_field = OrderedDict()
+    for full_name, field_name, category_param in categories:
+        members_by_field.setdefault(field_name, []).append((feed_slug(field_name, category_param), full_name))
+
+    all_members = tuple(member for members in members_by_field.values() for member in members)
+    if len(all_members) < 2:
+        return []
+
+    specs = [AggregateSpec("Alle Kategorien", AGGREGATE_SLUG, None, all_members)]
+    if len(members_by_field) > 1:
+        specs += [
+            AggregateSpec(f"{field_name} (alle Kategorien)", f"{slugify(field_name)}_{AGGREGATE_SLUG}", field_name, tuple(members))
+            for field_name, members in members_by_field.items() if len(members) > 1
+        ]
+
+    # Ein Sammel-Feed darf keinen Einzel-Feed überschreiben
+    member_slugs = {slug for slug, _ in all_members}
+    return [spec for spec in specs if spec.slug not in member_slugs]
+
+
+def _score_key(entry: EntryKey) -> Tuple[float, float]:
+    """Sortierschlüssel (höchster Score zuerst, dann bester Rang); fehlende Werte kommen zuletzt."""
+    try:
+        score = -float(entry[2])
+    except (IndexError, ValueError):
+        score = float("inf")
+    try:
+        rank = float(entry[1])
+    except (IndexError, ValueError):
+        rank = float("inf")
+    return score, rank
+
+
+def merge_ranked(feeds: Iterable[Tuple[str, List[EntryKey]]], max_items: int) -> List[Tuple[str, EntryKey]]:
+    """
+    Führt die Ranglisten mehrerer Feeds nach Score zusammen.
+
+    Args:
+        feeds: (Feed-Name, Einträge) je Feed, Einträge wie im Feed-Status (DOI, Rang, Score, ...)
+        max_items: Höchstzahl der Einträge im Ergebnis
+
+    Returns:
+        (Feed-Name, Eintrag) in absteigender Score-Reihenfolge. Eine DOI aus mehreren Feeds
+        erscheint nur einmal, mit dem Eintrag des höchsten Scores.
+    """
+    # Jede Rangliste wird einzeln sortiert (OOIR liefert sie bereits nach Rang), danach genügt ein k-Wege-Merge
+    ranked = [
+        sorted(((_score_key(entry), feed_name, entry) for entry in entries), key=lambda ranked_entry: ranked_entry[0])
+        for feed_name, entries in feeds
+    ]
+    merged = heapq.merge(*ranked, key=lambda ranked_entry: ranked_entry[0])
+
+    seen = set()
+    result = []
+    for _, feed_name, entry in merged:
+        doi = entry[0]
+        if doi != "N/A":
+            if doi in seen:
+                continue
+            seen.add(doi)
+        result.append((feed_name, entry))
+        if len(result) >= max_items:
+            break
+    return result
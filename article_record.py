@@ -0,0 +1,106 @@
+"""
+Article Record
+Kompakte Darstellung der Crossref-Metadaten eines Artikels. Eine Crossref-Antwort
+('message') enthält u.a. Referenzlisten, Lizenzen und Förderer; übernommen werden
+nur die Felder, die _create_rss_item tatsächlich ausgibt. Titel und Abstract werden dabei
+einmalig normalisiert (strip_markup), nicht bei jedem Erzeugen eines Items.
+"""
+
+from typing import List, Optional, Tuple
+
+from text_normalization import strip_markup
+
+# Kennzeichnet projizierte Einträge im DOI-Cache; ältere Einträge enthalten die vollständige Antwort
+# (ohne "_v") oder, in Version 1, Titel und Abstract noch mit Markup
+RECORD_VERSION = 2
+
+
+def _first(value):
+    """Crossref liefert Titel und Journal meist als Liste, verwendet wird der erste Eintrag."""
+    return value[0] if isinstance(value, list) else value
+
+
+def _date_parts(date: Optional[dict]) -> Optional[List[int]]:
+    if not date or not date.get("date-parts"):
+        return None
+    return date["date-parts"][0]
+
+
+class ArticleRecord:
+    __slots__ = ("title", "url", "authors", "journal", "published", "issued", "abstract")
+
+    def __init__(self, title: Optional[str] = None, url: Optional[str] = None, authors: Tuple[str, ...] = (),
+                 journal: Optional[str] = None, published: Optional[List[int]] = None,
+                 issued: Optional[List[int]] = None, abstract: Optional[str] = None):
+        """
+        Args:
+            title: Titel (ohne Markup, siehe strip_markup)
+            url: Direktlink zum Artikel
+            authors: Autorennamen in Anzeigeform ("Vorname Nachname" oder Gruppenname)
+            journal: Titel der Zeitschrift
+            published: date-parts des Veröffentlichungsdatums, z.B. [2024, 5, 17]
+            issued: date-parts des Erscheinungsdatums (Grundlage für pubDate)
+            abstract: Abstract (ohne JATS/HTML-Markup)
+        """
+        self.title = title
+        self.url = url
+        self.authors = authors
+        self.journal = journal
+        self.published = published
+        self.issued = issued
+        self.abstract = abstract
+
+    @classmethod
+    def from_crossref(cls, message: dict) -> "ArticleRecord":
+        """Projiziert eine Crossref-'message' auf die dargestellten Felder."""
+        authors = []
+        for author in message.get("author") or ():
+            if "given" in author and "family" in author:
+                authors.append(f"{author['given']} {author['family']}")
+            elif "name" in author: # Manchmal ist nur ein "name" Feld vorhanden
+                authors.append(author["name"])
+
+        return cls(
+            title=strip_markup(_first(message["title"])) if message.get("title") else None,
+            url=message.get("URL"),
+            authors=tuple(authors),
+            journal=_first(message["container-title"]) if message.get("container-title") else None,
+            published=_date_parts(message.get("published")),
+            issued=_date_parts(message.get("issued")),
+            abstract=strip_markup(message.get("abstract")) or None,
+        )
+
+    def to_dict(self) -> dict:
+        """Form für den DOI-Cache (JSON)."""
+        data = {name: getattr(self, name) for name in self.__slots__ if getattr(self, name) is not None}
+        data["authors"] = list(self.authors)
+        data["_v"] = RECORD_VERSION
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ArticleRecord":
+        """Liest einen Cache-Eintrag; vollständige Crossref-Antworten älterer Läufe werden projiziert."""
+        version = data.get("_v")
+        if version not in (1, RECORD_VERSION):
+            return cls.from_crossref(data)
+        title, abstract = data.get("title"), data.get("abstract")
+        if version == 1: # Markup wurde vor Version 2 erst beim Erzeugen der Items entfernt
+            title = strip_markup(title) if title is not None else None
+            abstract = strip_markup(abstract) or None
+        return cls(
+            title=title,
+            url=data.get("url"),
+            authors=tuple(data.get("authors", ())),
+            journal=data.get("journal"),
+            published=data.get("published"),
+            issued=data.get("issued"),
+            abstract=abstract,
+        )
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ArticleRecord):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"ArticleRecord(title={self.title!r}, url={self.url!r})"
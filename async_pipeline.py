@@ -0,0 +1,146 @@
+"""
+Async Pipeline
+asyncio-basierter Lauf, in dem OOIR-Abfragen, Crossref-Anreicherung und das Schreiben
+der Feeds überlappend als Pipeline mit begrenzten Warteschlangen ablaufen
+"""
+
+import asyncio
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from article_record import ArticleRecord
+
+if TYPE_CHECKING:
+    from ooir_rss_monitor import OOIRTrendMonitor
+
+Category = Tuple[str, str, Optional[str]]
+
+
+async def run_pipeline(monitor: "OOIRTrendMonitor", categories: List[Category], queue_size: int = 4) -> Tuple[int, int]:
+    """
+    Führt einen Lauf als dreistufige Pipeline aus:
+    OOIR-Abfrage -> Crossref-Anreicherung -> Feed schreiben.
+
+    Die blockierenden HTTP-Aufrufe laufen in Threads, die Rate Limits der Dienste
+    (Token-Buckets und Host-Grenzen im Transport) gelten daher unverändert.
+    Jede DOI wird über alle Kategorien hinweg nur einmal angefragt, unveränderte
+    Feeds und wiederverwendbare Items werden wie in OOIRTrendMonitor.run übersprungen.
+    Nicht zwischengespeicherte DOIs werden über Kategoriegrenzen hinweg gesammelt und
+    in Sammelabfragen zu je crossref_batch_size DOIs gestellt, wie in OOIRTrendMonitor.run.
+
+    Args:
+        monitor: Konfigurierter OOIRTrendMonitor
+        categories: Liste aus (Anzeigename, Feld, Kategorie)
+        queue_size: Maximale Anzahl an Kategorien, die zwischen zwei Stufen warten dürfen
+
+    Returns:
+        Tupel (Anzahl DOI-Verweise in allen Feeds, Anzahl eindeutiger DOIs)
+    """
+    enrich_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    write_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    crossref_slots = asyncio.Semaphore(monitor.max_workers)
+    ooir_slots = asyncio.Semaphore(monitor.ooir_workers)
+    doi_tasks: Dict[str, asyncio.Future] = {}
+    # Noch nicht abgefragte DOIs und das gemeinsame Ergebnis ihrer künftigen Sammelabfrage
+    pending_dois: List[str] = []
+    pending_result: List[asyncio.Future] = []
+    batch_size = max(1, monitor.crossref_batch_size)
+    doi_references = 0
+
+    async def fetch_metadata(dois: List[str], result: asyncio.Future) -> None:
+        try:
+            async with crossref_slots:
+                result.set_result(await asyncio.to_thread(monitor._fetch_missing_metadata, dois))
+        except Exception as e:
+            result.set_exception(e)
+
+    def flush(all_pending: bool) -> None:
+        """Startet die Sammelabfragen gesammelter DOIs, ohne all_pending nur volle Sammelabfragen."""
+        while pending_dois and (all_pending or len(pending_dois) >= batch_size):
+            batch = pending_dois[:batch_size]
+            del pending_dois[:batch_size]
+            result = pending_result.pop()
+            asyncio.create_task(fetch_metadata(batch, result))
+            if pending_dois:
+                # Verbleibende DOIs gehen in die nächste Sammelabfrage
+                next_result = asyncio.get_running_loop().create_future()
+                for doi in pending_dois:
+                    doi_tasks[doi] = next_result
+                pending_result.append(next_result)
+
+    async def collect_metadata(dois: List[str], tasks: List[asyncio.Future]) -> Dict[str, Optional[ArticleRecord]]:
+        metadata: Dict[str, Optional[ArticleRecord]] = {}
+        for records in await asyncio.gather(*tasks):
+            metadata.update(records)
+        return {doi: metadata.get(doi) for doi in dois}
+
+    async def fetch_category(full_name: str, field_name: str, category_param: Optional[str]) -> None:
+        async with ooir_slots:
+            papers_data = await asyncio.to_thread(monitor.fetch_trends, field_name, category_param)
+        monitor._record_fetch(field_name, category_param, papers_data)
+        await enrich_queue.put(((full_name, field_name, category_param), papers_data))
+
+    async def fetch_stage() -> None:
+        await asyncio.gather(*(fetch_category(*category) for category in categories))
+        await enrich_queue.put(None)
+
+    async def enrich_stage() -> None:
+        nonlocal doi_references
+        while True:
+            job = await enrich_queue.get()
+            if job is None:
+                break
+            category, papers_data = job
+
+            reusable_items = await asyncio.to_thread(monitor._plan_incremental_feed, *category, papers_data)
+            if reusable_items is None:
+                monitor.feeds_skipped += 1
+                print(f"RSS Feed für '{category[0]}' unverändert, wird übersprungen.")
+                continue
+
+            dois = []
+            for article in (papers_data or [])[:monitor._max_items_for(*category[1:])]:
+                if monitor._entry_key(*category[1:], article) in reusable_items:
+                    continue
+                doi = article.get("doi", "N/A")
+                if doi and doi != "N/A":
+                    doi_references += 1
+                    if doi not in dois:
+                        dois.append(doi)
+
+            # Zwischengespeicherte DOIs sind sofort verfügbar, die übrigen kommen zu den gesammelten DOIs
+            new_dois = [doi for doi in dois if doi not in doi_tasks]
+            if new_dois:
+                cached, missing = await asyncio.to_thread(monitor._lookup_cached_metadata, new_dois)
+                cached_result = asyncio.get_running_loop().create_future()
+                cached_result.set_result(cached)
+                for doi in cached:
+                    doi_tasks[doi] = cached_result
+                if missing and not pending_result:
+                    pending_result.append(asyncio.get_running_loop().create_future())
+                for doi in missing:
+                    doi_tasks[doi] = pending_result[-1]
+                pending_dois.extend(missing)
+                flush(all_pending=False)
+
+            # Der Writer wartet erst beim Schreiben auf das Ergebnis. Wartet er bereits, weil die
+            # Warteschlange voll ist, werden auch unvollständige Sammelabfragen gestartet
+            if write_queue.full():
+                flush(all_pending=True)
+            tasks = list({id(doi_tasks[doi]): doi_tasks[doi] for doi in dois}.values())
+            metadata_future = asyncio.ensure_future(collect_metadata(dois, tasks))
+            await write_queue.put((category, papers_data, reusable_items, metadata_future))
+        flush(all_pending=True)
+        await write_queue.put(None)
+
+    async def write_stage() -> None:
+        while True:
+            job = await write_queue.get()
+            if job is None:
+                break
+            (full_name, field_name, category_param), papers_data, reusable_items, metadata_future = job
+            metadata = await metadata_future
+            await asyncio.to_thread(monitor.generate_rss_feed, full_name, field_name, category_param, papers_data,
+                                    metadata, reusable_items)
+
+    await asyncio.gather(fetch_stage(), enrich_stage(), write_stage())
+    return doi_references, len(doi_tasks)
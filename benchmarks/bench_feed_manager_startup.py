@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Startzeit-Benchmark feed_manager.py
+Erzeugt ein synthetisches Ausgabeverzeichnis (Feeds, Manifest und Feed-Übersicht wie nach
+einem Lauf des Monitors) und misst die Wanduhrzeit einzelner CLI-Aufrufe als eigener Prozess,
+so wie sie aus Cron-Jobs und Skripten gestartet werden:
+
+    interpreter      python -c pass (Startzeit des Interpreters als Bezugsgröße)
+    help             feed_manager.py --help (nur Importe und argparse)
+    stats            Kennzahlen aus der Übersicht des letzten Laufs (Ziel: Median unter 50 ms)
+    stats_rescan     Scan mit aktuellem Scan-Index (keine Datei wird geparst)
+    stats_cold       Scan ohne Scan-Index (jeder Feed wird geparst)
+    reset            Verlaufsdaten eines Feeds zurücksetzen (öffnet nur die Verlaufsdatenbank)
+
+Aufruf:
+    python benchmarks/bench_feed_manager_startup.py                      # 50 Feeds à 50 Items
+    python benchmarks/bench_feed_manager_startup.py --feeds 2000 --runs 5
+    python benchmarks/bench_feed_manager_startup.py --output results.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from typing import Dict, List
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from feed_manifest import FeedManifest  # noqa: E402
+from feed_summary import write_summary  # noqa: E402
+from rss_writer import StreamingRSSWriter  # noqa: E402
+
+FEED_MANAGER = os.path.join(ROOT, "feed_manager.py")
+STATS_TARGET_MS = 50
+
+
+def build_output_dir(output_dir: str, feeds: int, items: int) -> None:
+    """Schreibt synthetische Feeds samt Manifest und Feed-Übersicht wie am Ende eines Laufs."""
+    manifest = FeedManifest(os.path.join(output_dir, ".history", "manifest.json"))
+    build_date = datetime.datetime.now(datetime.timezone.utc).strftime("%a, %d %b %Y %H:%M:%S GMT")
+    for feed in range(feeds):
+        name = f"Synthetic Field: Category {feed:05d}"
+        filename = f"synthetic_field_category_{feed:05d}.xml"
+        new_items = 0
+        with StreamingRSSWriter(os.path.join(output_dir, filename)) as writer:
+            writer.write_text_element("title", f"OOIR Trends: {name}")
+            writer.write_text_element("link", "https://ooir.org")
+            writer.write_text_element("lastBuildDate", build_date)
+            for index in range(items):
+                is_new = index % 10 == 0
+                new_items += is_new
+                item = ET.Element("item")
+                ET.SubElement(item, "title").text = f"{'🆕 ' if is_new else ''}Paper {feed}-{index}"
+                ET.SubElement(item, "description").text = "Journal: Synthetic\nScore: 1.0\nRang: 1 " * 4
+                ET.SubElement(item, "link").text = f"https://doi.org/10.0000/{feed}.{index}"
+                ET.SubElement(item, "guid").text = f"10.0000/{feed}.{index}"
+                writer.write_element(item)
+        manifest.record_feed(filename, name, "Synthetic Field", f"Category {feed:05d}", items=items,
+                             sizes={"xml": writer.bytes_written}, new_items=new_items, last_build=build_date)
+    manifest.save()
+    write_summary(output_dir, manifest.feeds())
+
+
+def time_command(args: List[str], runs: int, before_run=None) -> Dict[str, float]:
+    """Median und Minimum der Wanduhrzeit eines Prozesses in Millisekunden."""
+    timings = []
+    for _ in range(runs):
+        if before_run is not None:
+            before_run()
+        start = time.perf_counter()
+        subprocess.run(args, check=True, stdout=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"median_ms": round(statistics.median(timings), 2), "min_ms": round(min(timings), 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark der Startzeit von feed_manager.py")
+    parser.add_argument("--feeds", type=int, default=50, help="Anzahl synthetischer Feeds")
+    parser.add_argument("--items", type=int, default=50, help="Items pro Feed")
+    parser.add_argument("--runs", type=int, default=10, help="Wiederholungen pro Befehl")
+    parser.add_argument("--output", help="Ergebnis zusätzlich als JSON-Datei schreiben")
+    args = parser.parse_args()
+
+    output_dir = tempfile.mkdtemp(prefix="ooir-bench-fm-")
+    scan_index = os.path.join(output_dir, ".history", "scan_index.json")
+
+    def drop_scan_index():
+        if os.path.exists(scan_index):
+            os.remove(scan_index)
+
+    manager = [sys.executable, FEED_MANAGER, "--dir", output_dir]
+    try:
+        build_output_dir(output_dir, args.feeds, args.items)
+        # Ein Aufruf vorab füllt den Scan-Index und legt die Verlaufsdatenbank an
+        subprocess.run(manager + ["stats", "--rescan"], check=True, stdout=subprocess.DEVNULL)
+        subprocess.run(manager + ["reset", "Synthetic Field"], check=True, stdout=subprocess.DEVNULL)
+
+        commands = {
+            "interpreter": time_command([sys.executable, "-c", "pass"], args.runs),
+            "help": time_command(manager + ["--help"], args.runs),
+            "stats": time_command(manager + ["stats"], args.runs),
+            "stats_rescan": time_command(manager + ["stats", "--rescan"], args.runs),
+            "stats_cold": time_command(manager + ["stats", "--rescan"], args.runs, before_run=drop_scan_index),
+            "reset": time_command(manager + ["reset", "Synthetic Field"], args.runs),
+        }
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    interpreter_ms = commands["interpreter"]["median_ms"]
+    for name, timing in commands.items():
+        if name != "interpreter":
+            timing["over_interpreter_ms"] = round(timing["median_ms"] - interpreter_ms, 2)
+
+    report = {
+        "benchmark": "feed_manager_startup",
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "config": {"feeds": args.feeds, "items": args.items, "runs": args.runs},
+        "commands": commands,
+        "stats_target_ms": STATS_TARGET_MS,
+        # Gesamtzeit des Aufrufs, wie sie ein Cron-Job erlebt; over_interpreter_ms zeigt nur zur
+        # Information den Anteil von feed_manager.py ohne die Startzeit des Interpreters
+        "stats_within_target": commands["stats"]["median_ms"] < STATS_TARGET_MS,
+    }
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Pipeline-Benchmark
+Spielt aufgezeichnete OOIR- (paper-trends) und Crossref-Antworten (works) aus
+benchmarks/fixtures über einen injizierten Transport ab, führt OOIRTrendMonitor.run
+vollständig aus (Einzel-Feeds, Sammel-Feeds, Index) und gibt die Stufen-Zeiten aus
+RunMetrics aus: ooir_fetch, crossref_fetch, item_build, serialize, write.
+
+Aufruf:
+    python benchmarks/bench_pipeline.py                              # Fixtures wie aufgezeichnet
+    python benchmarks/bench_pipeline.py --categories 2000 --items 50 # synthetischer Großlauf
+    python benchmarks/bench_pipeline.py --output results.json        # Ergebnis als JSON-Datei
+"""
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from doi_cache import DOIMetadataCache  # noqa: E402
+from instrumentation import RunMetrics  # noqa: E402
+from ooir_rss_monitor import OOIRTrendMonitor  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+FIELD = "Clinical Medicine"
+
+
+class FixtureTransport:
+    """
+    Ersetzt HttpTransport: beantwortet OOIR- und Crossref-Anfragen aus den Fixtures,
+    ohne Netzwerkzugriff. Bietet dieselben Zähler wie HttpTransport.
+    """
+
+    def __init__(self, trends: Dict[str, List[dict]], works: Dict[str, dict], latency: float = 0.0):
+        self.trends = trends
+        self.works = works
+        self.latency = latency
+        self.requests_sent = 0
+        self.retries = 0
+        self.throttled = 0
+        self.revalidated = 0
+        self.bytes_received = 0
+
+    def get(self, url: str, params: Optional[dict] = None, headers: Optional[dict] = None,
+            timeout: float = 30, cache_key: Optional[str] = None) -> requests.Response:
+        self.requests_sent += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        parsed = urlparse(url)
+        response = requests.Response()
+        response.url = url
+        response.encoding = "utf-8"
+
+        if parsed.path == "/works":
+            # Sammelabfrage: filter=doi:a,doi:b mit optionaler Feldauswahl (select)
+            params = params or {}
+            dois = [part[len("doi:"):] for part in params.get("filter", "").split(",") if part.startswith("doi:")]
+            fields = params["select"].split(",") if params.get("select") else None
+            items = []
+            for doi in dois:
+                message = self.works.get(doi)
+                if message is not None:
+                    items.append({key: value for key, value in message.items() if fields is None or key in fields})
+            response.status_code = 200
+            response._content = json.dumps({
+                "status": "ok", "message-type": "work-list",
+                "message": {"total-results": len(items), "items": items},
+            }).encode("utf-8")
+        elif parsed.path.startswith("/works/"):
+            message = self.works.get(unquote(parsed.path[len("/works/"):]))
+            if message is None:
+                response.status_code = 404
+                response._content = b"Resource not found."
+            else:
+                response.status_code = 200
+                response._content = json.dumps({"status": "ok", "message-type": "work", "message": message}).encode("utf-8")
+        else:
+            category = parse_qs(parsed.query).get("category", [""])[0]
+            response.status_code = 200
+            response._content = json.dumps(self.trends.get(category, [])).encode("utf-8")
+
+        self.bytes_received += len(response._content)
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+def load_fixtures() -> Tuple[Dict[str, List[dict]], Dict[str, dict]]:
+    with open(os.path.join(FIXTURES_DIR, "ooir_paper_trends.json"), encoding="utf-8") as f:
+        trends = json.load(f)
+    with open(os.path.join(FIXTURES_DIR, "crossref_works.json"), encoding="utf-8") as f:
+        works = json.load(f)
+    return trends, works
+
+
+def synthesize(trends: Dict[str, List[dict]], works: Dict[str, dict], categories: int, items: int,
+               unique_ratio: float) -> Tuple[Dict[str, List[dict]], Dict[str, dict]]:
+    """
+    Erzeugt aus den Fixtures einen synthetischen Lauf mit beliebig vielen Kategorien und Items.
+    unique_ratio steuert, wie viele der DOIs über Kategorien hinweg eindeutig sind.
+    """
+    templates = [article for articles in trends.values() for article in articles]
+    template_works = list(works.values())
+    pool_size = max(1, int(categories * items * unique_ratio))
+
+    synthetic_trends: Dict[str, List[dict]] = {}
+    synthetic_works: Dict[str, dict] = {}
+    for category_index in range(categories):
+        category = f"Synthetic Category {category_index:05d}"
+        articles = []
+        for rank in range(1, items + 1):
+            doi_index = (category_index * items + rank - 1) % pool_size
+            doi = f"10.5555/bench.{doi_index:08d}"
+            template = templates[doi_index % len(templates)]
+            articles.append(dict(template, category=category, rank=rank, doi=doi, score=items - rank + 1))
+            if doi not in synthetic_works:
+                synthetic_works[doi] = dict(template_works[doi_index % len(template_works)], DOI=doi, URL=f"https://doi.org/{doi}")
+        synthetic_trends[category] = articles
+    return synthetic_trends, synthetic_works
+
+
+def run_benchmark(trends: Dict[str, List[dict]], works: Dict[str, dict], max_items: int, max_workers: int,
+                  latency: float, output_dir: str) -> dict:
+    """
+    Führt einen vollständigen Lauf (OOIRTrendMonitor.run) mit dem Fixture-Transport aus und
+    gibt die Stufen-Zeiten aus RunMetrics zurück. Stufen in Threads (ooir_fetch, crossref_fetch)
+    werden über alle Threads summiert und können daher die Wanduhrzeit übersteigen.
+    """
+    categories = [(f"{FIELD} ({category})", FIELD, category) for category in trends]
+    transport = FixtureTransport(trends, works, latency=latency)
+    metrics = RunMetrics()
+    monitor = OOIRTrendMonitor(
+        email="benchmark@example.org", output_dir=output_dir, max_items=max_items, max_workers=max_workers,
+        crossref_rate=1e9, ooir_rate=1e9, transport=transport, metrics=metrics,
+        metadata_cache=DOIMetadataCache(os.path.join(output_dir, ".history", "doi_cache.sqlite")),
+    )
+
+    # Konsolenausgaben des Monitors verfälschen die Messung nicht, werden aber unterdrückt
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        monitor.run(categories)
+        total_seconds = time.perf_counter() - start
+        monitor.close()
+
+    report = metrics.report()
+    item_count = report["stages"].get("item_build", {}).get("count", 0)
+    return {
+        "stages": {
+            name: {
+                "count": stage["count"],
+                "seconds": stage["total_seconds"],
+                "per_item_us": round(stage["total_seconds"] / item_count * 1e6, 3) if item_count else None,
+            }
+            for name, stage in report["stages"].items()
+        },
+        "total_seconds": round(total_seconds, 6),
+        "counters": {
+            "categories": len(categories),
+            "items": item_count,
+            "unique_dois": len({article.get("doi") for articles in trends.values() for article in articles[:max_items]}),
+            "requests": transport.requests_sent,
+            "bytes_received": transport.bytes_received,
+            "bytes_written": sum(sizes.get("xml", 0) for sizes in report["outputs"].values()),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark der Feed-Pipeline mit aufgezeichneten API-Antworten")
+    parser.add_argument("--categories", type=int, default=0, help="Anzahl synthetischer Kategorien (0 = Fixtures wie aufgezeichnet)")
+    parser.add_argument("--items", type=int, default=50, help="Items pro Kategorie (synthetisch) bzw. max_items")
+    parser.add_argument("--unique-ratio", type=float, default=0.6, help="Anteil eindeutiger DOIs im synthetischen Lauf")
+    parser.add_argument("--workers", type=int, default=3, help="max_workers für die Crossref-Anreicherung")
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulierte Latenz pro Anfrage in Sekunden")
+    parser.add_argument("--output", help="Ergebnis zusätzlich als JSON-Datei schreiben")
+    args = parser.parse_args()
+
+    trends, works = load_fixtures()
+    if args.categories:
+        trends, works = synthesize(trends, works, args.categories, args.items, args.unique_ratio)
+
+    output_dir = tempfile.mkdtemp(prefix="ooir-bench-")
+    try:
+        result = run_benchmark(trends, works, args.items, args.workers, args.latency, output_dir)
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    report = {
+        "benchmark": "pipeline",
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "config": {
+            "synthetic_categories": args.categories,
+            "items": args.items,
+            "unique_ratio": args.unique_ratio,
+            "workers": args.workers,
+            "latency": args.latency,
+        },
+        **result,
+    }
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Micro-Benchmark Textnormalisierung
+Vergleicht die Kosten pro Item der früheren Inline-Aufrufe von re.sub mit
+text_normalization (vorkompilierte Muster, gecachter feed_slug). Titel und Abstract werden
+inzwischen einmalig je DOI normalisiert (ArticleRecord.from_crossref, Ergebnis im DOI-Cache);
+diese Kosten sind gesondert ausgewiesen.
+
+Aufruf: python benchmarks/bench_text_normalization.py [--items N]
+"""
+
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from article_record import ArticleRecord  # noqa: E402
+from text_normalization import feed_slug, strip_markup  # noqa: E402
+
+TITLE = "Effects of <i>high-intensity</i> interval training on VO<sub>2</sub>max &amp; recovery"
+ABSTRACT = (
+    "<jats:title>Abstract</jats:title><jats:sec><jats:title>Background</jats:title>"
+    "<jats:p>Knee osteoarthritis is a leading cause of disability &#8211; especially in older adults.</jats:p>"
+    "</jats:sec><jats:sec><jats:title>Methods</jats:title><jats:p>We randomised 120 participants "
+    "(&lt;65 years) to exercise therapy or usual care.</jats:p></jats:sec>"
+) * 4
+FIELD = "Clinical Medicine"
+CATEGORY = "Nutrition & Dietetics"
+RECORD = ArticleRecord.from_crossref({"title": [TITLE], "abstract": ABSTRACT})
+
+
+# Stand vor text_normalization: unkompilierte Muster, Dateiname bei jedem Aufruf neu berechnet
+LEGACY = {
+    "title": lambda: re.sub(r'<[^>]*>', '', TITLE),
+    "abstract": lambda: re.sub(r'<[^>]*>', '', ABSTRACT),
+    "feed_slug": lambda: f"{re.sub(r'[^a-zA-Z0-9_]', '', FIELD.replace(' ', '_')).lower()}_{re.sub(r'[^a-zA-Z0-9_]', '', CATEGORY.replace(' ', '_')).lower()}",
+}
+
+# Nachher: Titel und Abstract liegen im ArticleRecord bereits normalisiert vor
+NORMALIZED = {
+    "title": lambda: RECORD.title,
+    "abstract": lambda: RECORD.abstract,
+    "feed_slug": lambda: feed_slug(FIELD, CATEGORY),
+}
+
+# Einmalig je neuer DOI: Entity-Auflösung, JATS-Blockgrenzen und Leerraum-Normalisierung
+PER_RECORD = {
+    "title": lambda: strip_markup(TITLE),
+    "abstract": lambda: strip_markup(ABSTRACT),
+}
+
+
+def measure(func, items: int, repeat: int) -> float:
+    """Bester Wert in µs pro Aufruf."""
+    return min(timeit.repeat(func, number=items, repeat=repeat)) / items * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-Benchmark der Textnormalisierung")
+    parser.add_argument("--items", type=int, default=20000, help="Anzahl Items pro Messung")
+    parser.add_argument("--repeat", type=int, default=5, help="Anzahl Wiederholungen (bester Wert zählt)")
+    args = parser.parse_args()
+
+    print(f"{'Schritt':12s} {'vorher':>12s} {'nachher':>12s}")
+    totals = [0.0, 0.0]
+    for step in LEGACY:
+        costs = []
+        for index, variant in enumerate((LEGACY, NORMALIZED)):
+            costs.append(measure(variant[step], args.items, args.repeat))
+            totals[index] += costs[-1]
+        print(f"{step:12s} {costs[0]:9.2f} µs {costs[1]:9.2f} µs")
+    print(f"{'pro Item':12s} {totals[0]:9.2f} µs {totals[1]:9.2f} µs")
+
+    print("\nEinmalig je neuer DOI (strip_markup in ArticleRecord.from_crossref):")
+    for step, func in PER_RECORD.items():
+        print(f"{step:12s} {measure(func, args.items, args.repeat):9.2f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Category Registry
+Lädt die überwachten Kategorien aus einer JSON-Konfiguration und entscheidet
+anhand von Aktualisierungsintervall und Priorität, welche Feeds bei einem Lauf fällig sind
+"""
+
+import datetime
+import json
+import os
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from text_normalization import feed_slug
+
+DEFAULT_MAX_ITEMS = 50
+DEFAULT_REFRESH_HOURS = 24.0
+DEFAULT_PRIORITY = 0
+# Der Workflow startet nicht auf die Sekunde genau, geplante GitHub-Läufe oft mehr als eine Stunde
+# verspätet. Ohne Toleranz würde ein täglicher Feed nach einem verspäteten Lauf am nächsten Tag
+# übersprungen; die Toleranz wächst daher mit dem Intervall (ein Viertel, mindestens eine Stunde).
+SCHEDULE_TOLERANCE = datetime.timedelta(hours=1)
+SCHEDULE_TOLERANCE_SHARE = 0.25
+
+
+def schedule_tolerance(refresh_hours: float) -> datetime.timedelta:
+    """Wie viel früher als refresh_hours nach der letzten Abfrage eine Kategorie bereits fällig ist."""
+    return max(SCHEDULE_TOLERANCE, datetime.timedelta(hours=refresh_hours * SCHEDULE_TOLERANCE_SHARE))
+
+
+class CategorySpec(NamedTuple):
+    name: str
+    field: str
+    category: Optional[str]
+    max_items: int = DEFAULT_MAX_ITEMS
+    refresh_hours: float = DEFAULT_REFRESH_HOURS
+    priority: int = DEFAULT_PRIORITY
+
+    @property
+    def slug(self) -> str:
+        return feed_slug(self.field, self.category)
+
+    def as_tuple(self) -> Tuple[str, str, Optional[str]]:
+        """Form (Anzeigename, Feld, Kategorie), wie sie run und generate_index_html erwarten."""
+        return self.name, self.field, self.category
+
+
+def load_categories(config_path: str) -> List[CategorySpec]:
+    """
+    Liest die Kategorien aus einer JSON-Datei der Form
+    {"defaults": {"max_items": 50, "refresh_hours": 24, "priority": 0},
+     "categories": [{"field": "Clinical Medicine", "category": "Rheumatology", "priority": 1}, ...]}
+
+    Fehlt "name", wird "<Feld> (<Kategorie>)" verwendet.
+
+    Raises:
+        ValueError: bei fehlenden Pflichtfeldern, ungültigen Werten oder doppelten Feeds
+    """
+    with open(config_path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    defaults = config.get("defaults", {})
+    specs: List[CategorySpec] = []
+    seen: Dict[str, str] = {}
+    for index, entry in enumerate(config.get("categories", [])):
+        field = entry.get("field")
+        if not field:
+            raise ValueError(f"Kategorie Nr. {index + 1} in '{config_path}' hat kein 'field'")
+        category = entry.get("category") or None
+        spec = CategorySpec(
+            name=entry.get("name") or (f"{field} ({category})" if category else field),
+            field=field,
+            category=category,
+            max_items=int(entry.get("max_items", defaults.get("max_items", DEFAULT_MAX_ITEMS))),
+            refresh_hours=float(entry.get("refresh_hours", defaults.get("refresh_hours", DEFAULT_REFRESH_HOURS))),
+            priority=int(entry.get("priority", defaults.get("priority", DEFAULT_PRIORITY))),
+        )
+        if spec.max_items < 1 or spec.refresh_hours < 0:
+            raise ValueError(f"Ungültige Werte für '{spec.name}' in '{config_path}': max_items >= 1 und refresh_hours >= 0 erwartet")
+        if spec.slug in seen:
+            raise ValueError(f"'{spec.name}' und '{seen[spec.slug]}' ergeben denselben Feed '{spec.slug}.xml'")
+        seen[spec.slug] = spec.name
+        specs.append(spec)
+    return specs
+
+
+class RefreshScheduler:
+    def __init__(self, state_path: str):
+        """
+        Args:
+            state_path: JSON-Datei mit dem Zeitpunkt der letzten erfolgreichen Abfrage je Feed
+        """
+        self.state_path = state_path
+        self._refreshed: Dict[str, str] = {}
+        self._changed: Set[str] = set()
+        self._dirty = False
+        # mark_refreshed wird aus den Worker-Threads der OOIR-Abfragen aufgerufen
+        self._lock = threading.Lock()
+
+        if os.path.exists(state_path):
+            try:
+                with open(state_path, "r", encoding="utf-8") as f:
+                    self._refreshed = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"WARNUNG: Zeitplan '{state_path}' konnte nicht gelesen werden, alle Kategorien gelten als fällig: {e}")
+
+    def last_refreshed(self, slug: str) -> Optional[datetime.datetime]:
+        value = self._refreshed.get(slug)
+        if not value:
+            return None
+        try:
+            return datetime.datetime.fromisoformat(value)
+        except ValueError:
+            return None
+
+    def due(self, specs: List[CategorySpec], now: Optional[datetime.datetime] = None,
+            limit: Optional[int] = None) -> List[CategorySpec]:
+        """
+        Gibt die fälligen Kategorien zurück, sortiert nach Priorität (höchste zuerst) und
+        danach nach Wartezeit (noch nie abgefragte und am längsten überfällige zuerst).
+        Mit limit werden höchstens so viele Kategorien eingeplant, der Rest folgt im nächsten Lauf.
+        """
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        candidates = []
+        for spec in specs:
+            last = self.last_refreshed(spec.slug)
+            if last is None:
+                overdue = datetime.timedelta.max
+            else:
+                overdue = now - last - datetime.timedelta(hours=spec.refresh_hours)
+                if overdue + schedule_tolerance(spec.refresh_hours) < datetime.timedelta(0):
+                    continue
+            candidates.append((spec, overdue))
+
+        candidates.sort(key=lambda candidate: (-candidate[0].priority, -candidate[1].total_seconds()))
+        due_specs = [spec for spec, _ in candidates]
+        return due_specs[:limit] if limit is not None else due_specs
+
+    def mark_refreshed(self, slug: str, when: Optional[datetime.datetime] = None) -> None:
+        when = when or datetime.datetime.now(datetime.timezone.utc)
+        with self._lock:
+            self._refreshed[slug] = when.isoformat()
+            self._changed.add(slug)
+            self._dirty = True
+
+    def changes(self, slugs: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        """Die in diesem Lauf vermerkten Abfragen (optional nur slugs), z.B. für das Zusammenführen von Shards."""
+        with self._lock:
+            selected = self._changed if slugs is None else self._changed.intersection(slugs)
+            return {slug: self._refreshed[slug] for slug in sorted(selected)}
+
+    def apply(self, changes: Dict[str, str]) -> None:
+        with self._lock:
+            for slug, refreshed_at in changes.items():
+                self._refreshed[slug] = refreshed_at
+                self._changed.add(slug)
+            if changes:
+                self._dirty = True
+
+    def save(self) -> None:
+        """Schreibt den Zeitplan atomar, falls sich etwas geändert hat."""
+        with self._lock:
+            if not self._dirty:
+                return
+            state_dir = os.path.dirname(self.state_path)
+            if state_dir and not os.path.exists(state_dir):
+                os.makedirs(state_dir)
+            tmp_path = f"{self.state_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._refreshed, f, ensure_ascii=False, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.state_path)
+            self._dirty = False
@@ -0,0 +1,146 @@
+"""
+DOI Metadata Cache
+Persistenter SQLite-Cache für Crossref-Metadaten, damit tägliche Läufe
+bereits bekannte DOIs nicht erneut herunterladen müssen
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from article_record import ArticleRecord
+
+DEFAULT_TTL_DAYS = 30
+DEFAULT_NEGATIVE_TTL_DAYS = 7
+DEFAULT_MAX_ENTRIES = 20000
+
+
+class DOIMetadataCache:
+    def __init__(self, db_path: str, ttl_days: float = DEFAULT_TTL_DAYS,
+                 negative_ttl_days: float = DEFAULT_NEGATIVE_TTL_DAYS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            db_path: Pfad zur SQLite-Datei
+            ttl_days: Gültigkeit eines Eintrags mit Metadaten in Tagen
+            negative_ttl_days: Gültigkeit eines Negativ-Eintrags (DOI bei Crossref unbekannt, 404) in Tagen
+            max_entries: Maximale Anzahl an Einträgen, ältere Zugriffe werden zuerst verdrängt (LRU)
+        """
+        self.db_path = db_path
+        self.ttl = ttl_days * 86400
+        self.negative_ttl = negative_ttl_days * 86400
+        self.max_entries = max_entries
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS doi_metadata (
+                doi TEXT PRIMARY KEY,
+                metadata TEXT,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_doi_metadata_last_access ON doi_metadata (last_access)")
+        self._conn.commit()
+
+    def get(self, doi: str) -> Tuple[bool, Optional[ArticleRecord]]:
+        """
+        Sucht eine DOI im Cache.
+
+        Returns:
+            Tupel (gefunden, Metadaten). Bei einem Negativ-Eintrag ist das Ergebnis (True, None).
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT metadata, expires_at FROM doi_metadata WHERE doi = ?", (doi,)
+            ).fetchone()
+
+            if row is None or row[1] < now:
+                self.misses += 1
+                return False, None
+
+            self._conn.execute("UPDATE doi_metadata SET last_access = ? WHERE doi = ?", (now, doi))
+            if row[0] is None:
+                self.negative_hits += 1
+                return True, None
+
+            self.hits += 1
+            return True, ArticleRecord.from_dict(json.loads(row[0]))
+
+    def put(self, doi: str, record: ArticleRecord) -> None:
+        """Speichert die (projizierten) Metadaten einer DOI."""
+        self._store(doi, json.dumps(record.to_dict(), ensure_ascii=False), self.ttl)
+
+    def put_missing(self, doi: str) -> None:
+        """Merkt sich, dass Crossref die DOI nicht kennt (Negative Caching)."""
+        self._store(doi, None, self.negative_ttl)
+
+    def _store(self, doi: str, payload: Optional[str], ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO doi_metadata (doi, metadata, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (doi, payload, now + ttl, now)
+            )
+            self._conn.commit()
+            self.stores += 1
+
+    def evict(self) -> int:
+        """
+        Entfernt abgelaufene Einträge und verdrängt bei Überschreitung von max_entries
+        die am längsten nicht mehr genutzten Einträge.
+
+        Returns:
+            Anzahl entfernter Einträge
+        """
+        with self._lock:
+            removed = self._conn.execute(
+                "DELETE FROM doi_metadata WHERE expires_at < ?", (time.time(),)
+            ).rowcount
+
+            count = self._conn.execute("SELECT COUNT(*) FROM doi_metadata").fetchone()[0]
+            overflow = count - self.max_entries
+            if overflow > 0:
+                removed += self._conn.execute(
+                    "DELETE FROM doi_metadata WHERE doi IN "
+                    "(SELECT doi FROM doi_metadata ORDER BY last_access ASC LIMIT ?)", (overflow,)
+                ).rowcount
+
+            self._conn.commit()
+            self.evictions += removed
+            return removed
+
+    def stats(self) -> Dict[str, float]:
+        """Gibt die Trefferzähler des aktuellen Laufs zurück."""
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits + self.negative_hits) / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        """Bereinigt den Cache und schließt die Datenbankverbindung."""
+        self.evict()
+        with self._lock:
+            self._conn.close()
@@ -2,25 +2,211 @@
 """
 RSS Feed Manager Utility
 Hilfswerkzeug zur Verwaltung der OOIR RSS Feeds
+
+Wird häufig aus Cron-Jobs und Skripten aufgerufen: Module für Scan, Verlauf und Manifest
+werden daher erst im jeweiligen Befehl importiert, 'stats' liest die vom Monitor
+vorberechnete Übersicht (siehe feed_summary.py).
 """
 
 import os
-import pickle
 import json
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import argparse
-from typing import Dict, List
-import xml.etree.ElementTree as ET
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from feed_summary import load_summary
+
+if TYPE_CHECKING:
+    from feed_manifest import FeedManifest
+    from history_store import HistoryStore
 
 class FeedManager:
     def __init__(self, rss_dir: str = "rss_feeds"):
         self.rss_dir = rss_dir
         self.history_dir = os.path.join(rss_dir, ".history")
-        
-    def get_feed_stats(self) -> Dict:
+        self._history_store = None
+        self._manifest = None
+
+    @property
+    def history_store(self) -> "HistoryStore":
+        """
+        Verlaufsdatenbank, wird beim ersten Zugriff geöffnet. Alte '*_history.pkl'-Dateien
+        werden einmalig übernommen, wenn die Datenbank dabei neu angelegt wird.
+        """
+        if self._history_store is None:
+            from history_store import HistoryStore
+            migrate = self._has_legacy_history()
+            self._history_store = HistoryStore(self._history_db_path)
+            if migrate:
+                self._history_store.migrate_pickle_files(self.history_dir)
+        return self._history_store
+
+    @property
+    def _history_db_path(self) -> str:
+        return os.path.join(self.history_dir, "history.sqlite")
+
+    def _has_legacy_history(self) -> bool:
+        """Gibt es noch zu übernehmende '*_history.pkl'-Dateien? Mit vorhandener Datenbank ist die Übernahme erfolgt."""
+        if os.path.exists(self._history_db_path) or not os.path.isdir(self.history_dir):
+            return False
+        return any(name.endswith("_history.pkl") for name in os.listdir(self.history_dir))
+
+    @property
+    def manifest(self) -> "FeedManifest":
+        """Manifest des Monitors ('.history/manifest.json'), wird beim ersten Zugriff gelesen."""
+        if self._manifest is None:
+            from feed_manifest import FeedManifest
+            self._manifest = FeedManifest(os.path.join(self.history_dir, "manifest.json"))
+        return self._manifest
+
+    def is_known_paper(self, field: str, paper_hash: str) -> bool:
         """
-        Sammelt Statistiken über alle RSS Feeds
+        Prüft, ob ein Paper in der Historie eines Feeds bereits bekannt ist,
+        ohne die komplette Historie zu laden.
+        """
+        return self.history_store.is_known(self._history_key(field), paper_hash)
+
+    def _history_key(self, field: str) -> str:
+        return field.replace(" ", "_").replace("&", "and").lower()
         
+    def scan_feeds(self) -> Dict[str, dict]:
+        """
+        Scannt alle XML-Feeds (siehe feed_scan.FeedScanner). Nur seit dem letzten Aufruf
+        geänderte Dateien werden neu geparst, bei vielen Dateien in einem Prozess-Pool.
+        Mit Manifest werden nur die aktuellen Feeds geprüft, verwaiste Dateien bleiben außen vor.
+        """
+        from feed_scan import FeedScanner
+
+        filenames = list(self.manifest.feeds()) if self.manifest.exists else None
+        return FeedScanner(self.rss_dir).scan(filenames)
+
+    def list_feeds(self) -> None:
+        """Listet die Feeds aus dem Manifest auf, ohne das Verzeichnis zu durchsuchen oder XML zu parsen."""
+        if not self.manifest.exists:
+            print("❌ Kein Manifest gefunden! Bitte zuerst ooir_rss_monitor.py ausführen.")
+            return
+        for filename, entry in self.manifest.feeds().items():
+            items = entry["items"] if entry.get("items") is not None else "?"
+            print(f"{filename}: {entry['name']} ({items} Items, aktualisiert {entry.get('updated') or 'unbekannt'})")
+        for legacy_filename, target in self.manifest.redirects().items():
+            print(f"{legacy_filename} -> {target} (Weiterleitung)")
+
+    def show_trends(self, feed: str, limit: Optional[int] = 20) -> None:
+        """
+        Zeigt die Trend-Kennzahlen der zuletzt archivierten Rangliste eines Feeds, darunter Tage
+        im Trend und Rangänderung seit gestern, die bewusst nicht in den Feeds stehen.
+
+        Args:
+            feed: Dateiname ('clinical_medicine_orthopedics.xml') oder Name ohne Endung
+            limit: Höchstzahl der angezeigten Papers (None = alle)
+        """
+        archive_path = os.path.join(self.history_dir, "trend_archive.sqlite")
+        if not os.path.exists(archive_path):
+            print("❌ Kein Trend-Archiv gefunden! Bitte zuerst ooir_rss_monitor.py ausführen.")
+            return
+        from trend_archive import TrendArchive
+        slug = feed[:-len(".xml")] if feed.endswith(".xml") else feed
+        archive = TrendArchive(archive_path)
+        try:
+            trends = archive.latest(slug, limit)
+        finally:
+            archive.close()
+        if not trends:
+            print(f"❌ Keine archivierten Trends für '{slug}' gefunden")
+            return
+
+        print(f"📈 TRENDS: {slug}")
+        print("-" * 60)
+        for doi, stats in trends:
+            rank = f"#{stats.rank}" if stats.rank is not None else "#?"
+            days = f"{stats.days_trending} {'Tag' if stats.days_trending == 1 else 'Tage'}"
+            line = f"{rank:>4} {'🆕 ' if stats.is_new else ''}{doi}: im Trend seit {stats.first_seen} ({days})"
+            if stats.rank_delta is not None:
+                line += f", Rang seit gestern: {stats.rank_delta:+d}" if stats.rank_delta else ", Rang seit gestern: unverändert"
+            print(line)
+
+    def collect_garbage(self, dry_run: bool = False, redirect: bool = False, base_url: Optional[str] = None) -> List[str]:
+        """
+        Entfernt Feed-Dateien, die nicht im Manifest stehen: Feeds nicht mehr konfigurierter
+        Kategorien und Kopien unter früheren Dateinamen (z.B. 'clinicalmedicine_nutritiondietetics.xml'
+        neben 'clinical_medicine_nutrition__dietetics.xml').
+
+        Args:
+            dry_run: Nur anzeigen, was entfernt würde
+            redirect: Frühere Dateinamen eines aktuellen Feeds nicht löschen, sondern durch einen
+                      Hinweis-Feed mit Link auf den neuen Dateinamen ersetzen
+            base_url: Öffentliche URL des Ausgabeverzeichnisses, z.B. 'https://example.github.io/ooir-rss-feeds/';
+                      für redirect erforderlich, da RSS absolute Links verlangt
+
+        Returns:
+            Die entfernten (bzw. bei dry_run zu entfernenden) Dateinamen
+        """
+        from feed_manifest import find_orphans
+
+        if redirect and not base_url:
+            raise ValueError("Für Weiterleitungen wird base_url benötigt (absolute Links im Hinweis-Feed)")
+        if not self.manifest.exists:
+            print("❌ Kein Manifest gefunden! Ohne Manifest ist unklar, welche Feeds aktuell sind.")
+            return []
+
+        orphans = find_orphans(self.rss_dir, self.manifest)
+        legacy_names = self.manifest.legacy_names() if redirect else {}
+        removed = []
+        for filename in orphans:
+            target = legacy_names.get(filename)
+            if target is not None:
+                print(f"↪️  {filename} -> {target}")
+                if not dry_run:
+                    self._write_redirect_feed(filename, target, base_url)
+                continue
+            print(f"🧹 {filename}")
+            if not dry_run and os.path.exists(os.path.join(self.rss_dir, filename)):
+                os.remove(os.path.join(self.rss_dir, filename))
+            removed.append(filename)
+
+        if not dry_run:
+            self.manifest.save()
+        action = "würden entfernt" if dry_run else "entfernt"
+        print(f"✅ {len(removed)} verwaiste Dateien {action}, {len(orphans) - len(removed)} Weiterleitungen.")
+        return removed
+
+    def _write_redirect_feed(self, legacy_filename: str, target_filename: str, base_url: str) -> None:
+        """Ersetzt einen Feed unter einem früheren Dateinamen durch einen Hinweis auf den neuen."""
+        from rss_writer import StreamingRSSWriter # Nur für Weiterleitungen benötigt
+        import xml.etree.ElementTree as ET
+
+        entry = self.manifest.feeds()[target_filename]
+        target_url = f"{base_url.rstrip('/')}/{target_filename}"
+        now_gmt = datetime.now(timezone.utc).strftime("%a, %d %b %Y %H:%M:%S GMT")
+        # Ohne Vorkomprimierung entfernt der Writer auch veraltete .gz/.br-Dateien des alten Namens
+        with StreamingRSSWriter(os.path.join(self.rss_dir, legacy_filename)) as writer:
+            writer.write_text_element("title", f"OOIR Trends: {entry['name']} (umgezogen)")
+            writer.write_text_element("description", f"Dieser Feed ist umgezogen nach {target_filename}")
+            writer.write_text_element("link", target_url)
+            writer.write_text_element("language", "en-us")
+            writer.write_text_element("lastBuildDate", now_gmt)
+            item = ET.Element("item")
+            ET.SubElement(item, "title").text = f"Feed umgezogen: bitte {target_filename} abonnieren"
+            ET.SubElement(item, "description").text = (
+                f"Der Feed '{entry['name']}' wird nur noch unter {target_filename} aktualisiert.")
+            ET.SubElement(item, "link").text = target_url
+            ET.SubElement(item, "guid", isPermaLink="false").text = f"ooir-feed-moved-{legacy_filename}"
+            ET.SubElement(item, "pubDate").text = now_gmt
+            writer.write_element(item)
+        self.manifest.add_redirect(legacy_filename, target_filename)
+
+    def _has_history(self) -> bool:
+        """Gibt es Verlaufsdaten (Datenbank oder noch zu übernehmende '*_history.pkl'-Dateien)?"""
+        return os.path.exists(self._history_db_path) or self._has_legacy_history()
+
+    def get_feed_stats(self, rescan: bool = False) -> Dict:
+        """
+        Sammelt Statistiken über alle RSS Feeds. Die Kennzahlen stammen aus der Übersicht des
+        letzten Laufs, solange kein Feed seitdem geändert wurde, sonst aus einem Scan.
+
+        Args:
+            rescan: Feeds immer scannen, auch wenn eine gültige Übersicht vorliegt
+
         Returns:
             Dictionary mit Feed-Statistiken
         """
@@ -31,65 +217,47 @@ class FeedManager:
             "last_updated": None
         }
         
-        # RSS-Dateien analysieren
+        # RSS-Dateien analysieren (parallel, unveränderte Feeds aus dem Scan-Index)
         if os.path.exists(self.rss_dir):
-            for filename in os.listdir(self.rss_dir):
-                if filename.endswith('.xml'):
-                    feed_path = os.path.join(self.rss_dir, filename)
-                    feed_name = filename.replace('.xml', '').replace('_', ' ').title()
-                    
-                    try:
-                        # XML-Datei parsen
-                        tree = ET.parse(feed_path)
-                        root = tree.getroot()
-                        
-                        items = root.findall('.//item')
-                        new_items = [item for item in items if '🆕' in item.find('title').text]
-                        
-                        # Letzte Aktualisierung
-                        last_build = root.find('.//lastBuildDate')
-                        last_update = last_build.text if last_build is not None else "Unbekannt"
-                        
-                        stats["feeds"][feed_name] = {
-                            "filename": filename,
-                            "total_items": len(items),
-                            "new_items": len(new_items),
-                            "last_updated": last_update,
-                            "file_size": os.path.getsize(feed_path)
-                        }
-                        
-                        stats["total_papers"] += len(items)
-                        
-                    except ET.ParseError as e:
-                        print(f"Fehler beim Parsen von {filename}: {e}")
+            results = None if rescan else load_summary(self.rss_dir)
+            if results is None:
+                results = self.scan_feeds()
+            for filename, result in results.items():
+                if result["parse_error"]:
+                    print(f"Fehler beim Parsen von {filename}: {result['parse_error']}")
+                    continue
+
+                feed_name = filename.replace('.xml', '').replace('_', ' ').title()
+                stats["feeds"][feed_name] = {
+                    "filename": filename,
+                    "total_items": result["total_items"],
+                    "new_items": result["new_items"],
+                    "last_updated": result["last_updated"] or "Unbekannt",
+                    "file_size": result["file_size"]
+                }
+                
+                stats["total_papers"] += result["total_items"]
                         
             stats["total_feeds"] = len(stats["feeds"])
         
-        # Verlaufsdaten analysieren
-        if os.path.exists(self.history_dir):
-            for filename in os.listdir(self.history_dir):
-                if filename.endswith('_history.pkl'):
-                    field_name = filename.replace('_history.pkl', '').replace('_', ' ').title()
-                    history_path = os.path.join(self.history_dir, filename)
-                    
-                    try:
-                        with open(history_path, 'rb') as f:
-                            history = pickle.load(f)
-                            
-                        if field_name in stats["feeds"]:
-                            stats["feeds"][field_name]["known_papers"] = len(history.get("known_papers", set()))
-                            stats["feeds"][field_name]["history_updated"] = history.get("last_updated", "Unbekannt")
-                            
-                    except (pickle.PickleError, FileNotFoundError) as e:
-                        print(f"Fehler beim Lesen der Verlaufsdaten {filename}: {e}")
+        # Verlaufsdaten analysieren (nur Zählwerte aus der Datenbank, keine vollständige Historie)
+        if self._has_history():
+            for feed_key, (known_papers, last_updated) in self.history_store.feed_summaries().items():
+                field_name = feed_key.replace('_', ' ').title()
+                if field_name in stats["feeds"]:
+                    stats["feeds"][field_name]["known_papers"] = known_papers
+                    stats["feeds"][field_name]["history_updated"] = last_updated
         
         return stats
     
-    def print_stats(self) -> None:
+    def print_stats(self, rescan: bool = False) -> Dict:
         """
         Gibt Feed-Statistiken auf der Konsole aus
+
+        Returns:
+            Die ausgegebenen Statistiken (siehe get_feed_stats)
         """
-        stats = self.get_feed_stats()
+        stats = self.get_feed_stats(rescan)
         
         print("=" * 60)
         print("📊 OOIR RSS FEED STATISTIKEN")
@@ -112,15 +280,18 @@ class FeedManager:
                 print()
         else:
             print("❌ Keine RSS-Feeds gefunden!")
+        return stats
     
-    def export_stats(self, output_file: str = "feed_stats.json") -> None:
+    def export_stats(self, output_file: str = "feed_stats.json", stats: Optional[Dict] = None) -> None:
         """
         Exportiert Statistiken als JSON-Datei
         
         Args:
             output_file: Pfad zur Ausgabedatei
+            stats: Bereits gesammelte Statistiken (sonst über get_feed_stats)
         """
-        stats = self.get_feed_stats()
+        if stats is None:
+            stats = self.get_feed_stats()
         
         # DateTime-Objekte für JSON serialisierbar machen
         def serialize_datetime(obj):
@@ -140,53 +311,18 @@ class FeedManager:
         Args:
             days: Alter in Tagen, ab dem Daten gelöscht werden
         """
-        if not os.path.exists(self.history_dir):
-            print("❌ Kein Verlaufsverzeichnis gefunden!")
+        if not self._has_history():
+            print("❌ Keine Verlaufsdaten gefunden!")
             return
         
         cutoff_date = datetime.now() - timedelta(days=days)
-        cleaned_count = 0
-        
-        for filename in os.listdir(self.history_dir):
-            if filename.endswith('_history.pkl'):
-                history_path = os.path.join(self.history_dir, filename)
-                
-                try:
-                    with open(history_path, 'rb') as f:
-                        history = pickle.load(f)
-                    
-                    # Alte Papers aus der Historie entfernen
-                    old_papers = []
-                    for paper in history.get("papers_data", []):
-                        added_date_str = paper.get("_added_date", "")
-                        if added_date_str:
-                            added_date = datetime.fromisoformat(added_date_str)
-                            if added_date < cutoff_date:
-                                old_papers.append(paper)
-                    
-                    if old_papers:
-                        # Neue History ohne alte Papers
-                        history["papers_data"] = [
-                            p for p in history.get("papers_data", [])
-                            if p not in old_papers
-                        ]
-                        
-                        # Known papers Set aktualisieren
-                        history["known_papers"] = {
-                            p.get("_hash", "") for p in history["papers_data"]
-                        }
-                        
-                        # Aktualisierte History speichern
-                        with open(history_path, 'wb') as f:
-                            pickle.dump(history, f)
-                        
-                        cleaned_count += len(old_papers)
-                        print(f"🧹 {filename}: {len(old_papers)} alte Papers entfernt")
-                
-                except (pickle.PickleError, ValueError) as e:
-                    print(f"❌ Fehler bei {filename}: {e}")
-        
-        print(f"✅ Bereinigung abgeschlossen. {cleaned_count} alte Papers entfernt.")
+
+        # Ein einziger Bereichs-Delete über den Index auf dem Aufnahmedatum
+        removed = self.history_store.delete_older_than(cutoff_date)
+        for feed_key, count in sorted(removed.items()):
+            print(f"🧹 {feed_key}: {count} alte Papers entfernt")
+
+        print(f"✅ Bereinigung abgeschlossen. {sum(removed.values())} alte Papers entfernt.")
     
     def reset_feed(self, field: str) -> None:
         """
@@ -195,11 +331,8 @@ class FeedManager:
         Args:
             field: Name des Wissenschaftsbereichs
         """
-        filename = field.replace(" ", "_").replace("&", "and").lower() + "_history.pkl"
-        history_path = os.path.join(self.history_dir, filename)
-        
-        if os.path.exists(history_path):
-            os.remove(history_path)
+        # Ohne Verlaufsdaten wird keine leere Datenbank angelegt
+        if self._has_history() and self.history_store.reset(self._history_key(field)):
             print(f"✅ Verlaufsdaten für '{field}' zurückgesetzt")
         else:
             print(f"❌ Keine Verlaufsdaten für '{field}' gefunden")
@@ -214,38 +347,16 @@ class FeedManager:
         valid_feeds = 0
         invalid_feeds = 0
         
-        if os.path.exists(self.rss_dir):
-            for filename in os.listdir(self.rss_dir):
-                if filename.endswith('.xml'):
-                    feed_path = os.path.join(self.rss_dir, filename)
-                    
-                    try:
-                        tree = ET.parse(feed_path)
-                        root = tree.getroot()
-                        
-                        # Basic RSS-Struktur prüfen
-                        if root.tag != "rss":
-                            raise Exception("Kein gültiger RSS-Feed (fehlendes <rss> Element)")
-                        
-                        channel = root.find('channel')
-                        if channel is None:
-                            raise Exception("Kein <channel> Element gefunden")
-                        
-                        title = channel.find('title')
-                        if title is None or not title.text:
-                            raise Exception("Kein Titel gefunden")
-                        
-                        items = channel.findall('item')
-                        
-                        print(f"✅ {filename}: {len(items)} Items, Titel: '{title.text}'")
-                        valid_feeds += 1
-                        
-                    except ET.ParseError as e:
-                        print(f"❌ {filename}: XML-Parsing-Fehler: {e}")
-                        invalid_feeds += 1
-                    except Exception as e:
-                        print(f"❌ {filename}: {e}")
-                        invalid_feeds += 1
+        for filename, result in self.scan_feeds().items():
+            if result["parse_error"]:
+                print(f"❌ {filename}: XML-Parsing-Fehler: {result['parse_error']}")
+                invalid_feeds += 1
+            elif result["validation_error"]:
+                print(f"❌ {filename}: {result['validation_error']}")
+                invalid_feeds += 1
+            else:
+                print(f"✅ {filename}: {result['total_items']} Items, Titel: '{result['title']}'")
+                valid_feeds += 1
         
         print("-" * 40)
         print(f"✅ Gültige Feeds: {valid_feeds}")
@@ -259,4 +370,66 @@ def main():
     subparsers = parser.add_subparsers(dest="command", help="Verfügbare Befehle")
     
     # Stats Befehl
-    stats_parser = subparsers.add_parser("stats", help="Zeigt Feed-
\ No newline at end of file
+    stats_parser = subparsers.add_parser("stats", help="Zeigt Feed-Statistiken")
+    stats_parser.add_argument("--export", help="Exportiert die Statistiken zusätzlich als JSON-Datei")
+    stats_parser.add_argument("--rescan", action="store_true",
+                              help="Feeds neu scannen statt die Übersicht des letzten Laufs zu verwenden")
+    
+    # Clean Befehl
+    clean_parser = subparsers.add_parser("clean", help="Bereinigt alte Verlaufsdaten")
+    clean_parser.add_argument("--days", type=int, default=30, help="Alter in Tagen, ab dem Papers entfernt werden")
+    
+    # Reset Befehl
+    reset_parser = subparsers.add_parser("reset", help="Setzt die Verlaufsdaten eines Feeds zurück")
+    reset_parser.add_argument("field", help="Name des Wissenschaftsbereichs")
+    
+    # Validate Befehl
+    subparsers.add_parser("validate", help="Validiert alle RSS-Feeds")
+
+    # List Befehl
+    subparsers.add_parser("list", help="Listet die aktuellen Feeds aus dem Manifest auf")
+
+    # Trends Befehl
+    trends_parser = subparsers.add_parser("trends", help="Zeigt Tage im Trend und Rangänderung der Papers eines Feeds")
+    trends_parser.add_argument("feed", help="Dateiname des Feeds, z.B. clinical_medicine_orthopedics.xml")
+    trends_parser.add_argument("--limit", type=int, default=20, help="Höchstzahl der angezeigten Papers")
+
+    # GC Befehl
+    gc_parser = subparsers.add_parser("gc", help="Entfernt verwaiste Feed-Dateien, die nicht im Manifest stehen")
+    gc_parser.add_argument("--dry-run", action="store_true", help="Nur anzeigen, was entfernt würde")
+    gc_parser.add_argument("--redirect", action="store_true",
+                           help="Frühere Dateinamen aktueller Feeds durch einen Hinweis-Feed auf den neuen Namen ersetzen")
+    gc_parser.add_argument("--base-url", default=os.getenv("FEED_BASE_URL"),
+                           help="Öffentliche URL des Feed-Verzeichnisses für die Links der Hinweis-Feeds "
+                                "(Standard: Umgebungsvariable FEED_BASE_URL), für --redirect erforderlich")
+    
+    args = parser.parse_args()
+    if args.command == "gc" and args.redirect:
+        if not args.base_url:
+            parser.error("--redirect benötigt --base-url (oder FEED_BASE_URL), RSS verlangt absolute Links")
+        if not args.base_url.startswith(("https://", "http://")):
+            parser.error(f"--base-url muss eine absolute http(s)-URL sein, nicht '{args.base_url}'")
+    manager = FeedManager(args.dir)
+    
+    if args.command == "stats":
+        stats = manager.print_stats(rescan=args.rescan)
+        if args.export:
+            manager.export_stats(args.export, stats)
+    elif args.command == "clean":
+        manager.clean_old_history(args.days)
+    elif args.command == "reset":
+        manager.reset_feed(args.field)
+    elif args.command == "validate":
+        manager.validate_feeds()
+    elif args.command == "list":
+        manager.list_feeds()
+    elif args.command == "trends":
+        manager.show_trends(args.feed, args.limit)
+    elif args.command == "gc":
+        manager.collect_garbage(dry_run=args.dry_run, redirect=args.redirect, base_url=args.base_url)
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
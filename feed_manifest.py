@@ -0,0 +1,203 @@
+"""
+Feed Manifest
+Verzeichnis der Dateien, die dem Monitor im Ausgabeverzeichnis gehören: ein Eintrag je
+Feed (Anzeigename, Feld, Kategorie, Items, Größe, vorkomprimierte Geschwister) sowie
+Index-Seite und Weiterleitungen alter Dateinamen. Werkzeuge wie feed_manager.py können
+die Feeds daraus auflisten, ohne das Verzeichnis zu durchsuchen, und verwaiste Dateien erkennen.
+"""
+
+import datetime
+import json
+import os
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from text_normalization import feed_slug, legacy_feed_slugs
+
+if TYPE_CHECKING:
+    from aggregate_feeds import AggregateSpec
+
+MANIFEST_VERSION = 1
+INDEX_FILENAME = "index.html"
+# Endungen, die als Feed-Ausgabe gelten; alle anderen Dateien (CNAME, .nojekyll ...) bleiben unberührt
+FEED_SUFFIXES = (".xml", ".xml.gz", ".xml.br")
+# JSON-Ausgaben gelten nur als Feed-Ausgabe, wenn ihr Name zu einem bekannten Feed gehört (siehe find_orphans)
+STRUCTURED_FEED_SUFFIXES = (".json", ".ndjson")
+# Ausgaben, die den Feed ersetzen statt ihn zu komprimieren ('<feed>.json' statt '<feed>.xml.json')
+_ALTERNATE_FORMATS = ("json", "ndjson")
+
+
+def _sibling_name(filename: str, output: str) -> str:
+    """Dateiname einer weiteren Ausgabe des Feeds, z.B. ('a.xml', 'gz') -> 'a.xml.gz', ('a.xml', 'json') -> 'a.json'."""
+    if output in _ALTERNATE_FORMATS:
+        return f"{os.path.splitext(filename)[0]}.{output}"
+    return f"{filename}.{output}"
+
+
+class FeedManifest:
+    def __init__(self, manifest_path: str):
+        """
+        Args:
+            manifest_path: Pfad zur JSON-Datei, z.B. '<output_dir>/.history/manifest.json'
+        """
+        self.manifest_path = manifest_path
+        self._feeds: Dict[str, dict] = {}
+        self._redirects: Dict[str, str] = {}
+        self._index: Optional[str] = None
+        self._changed: Set[str] = set()
+        self._dirty = False
+
+        if os.path.exists(manifest_path):
+            try:
+                with open(manifest_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"WARNUNG: Manifest '{manifest_path}' konnte nicht gelesen werden und wird neu aufgebaut: {e}")
+            else:
+                if data.get("version") == MANIFEST_VERSION:
+                    self._feeds = data.get("feeds", {})
+                    self._redirects = data.get("redirects", {})
+                    self._index = data.get("index")
+
+    @property
+    def exists(self) -> bool:
+        return os.path.exists(self.manifest_path)
+
+    def record_feed(self, filename: str, name: str, field: str, category: Optional[str],
+                    items: int, sizes: Dict[str, int], aggregate: bool = False,
+                    new_items: Optional[int] = None, last_build: Optional[str] = None) -> None:
+        """
+        Vermerkt einen in diesem Lauf geschriebenen Feed.
+
+        Args:
+            filename: Dateiname relativ zum Ausgabeverzeichnis, z.B. 'clinical_medicine_orthopedics.xml'
+            items: Anzahl der geschriebenen <item>-Elemente
+            sizes: Dateigrößen wie bei RunMetrics.record_output, z.B. {"xml": 81234, "gz": 9876}
+            aggregate: Sammel-Feed über mehrere Kategorien (siehe aggregate_feeds.py)
+            new_items: Items mit '🆕' im Titel, last_build: lastBuildDate des Feeds (für feed_summary.py)
+        """
+        self._feeds[filename] = {
+            "name": name,
+            "field": field,
+            "category": category,
+            "items": items,
+            "bytes": sizes.get("xml", 0),
+            "siblings": sorted(_sibling_name(filename, output) for output in sizes if output != "xml"),
+            "updated": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "new_items": new_items,
+            "last_build": last_build,
+        }
+        if aggregate:
+            self._feeds[filename]["aggregate"] = True
+        # Eine frühere Weiterleitung unter demselben Dateinamen wird durch den Feed ersetzt
+        self._redirects.pop(filename, None)
+        self._changed.add(filename)
+        self._dirty = True
+
+    def set_categories(self, categories: List[Tuple[str, str, Optional[str]]],
+                       aggregates: Sequence["AggregateSpec"] = ()) -> None:
+        """
+        Legt fest, welche Feeds zum Ausgabeverzeichnis gehören (alle Kategorien und Sammel-Feeds der Index-Seite).
+        Feeds, die in diesem Lauf nicht neu geschrieben wurden, behalten ihre bisherigen Angaben;
+        Feeds nicht mehr konfigurierter Kategorien und Weiterleitungen auf sie fallen heraus
+        und gelten danach als verwaist.
+        """
+        feeds = {}
+        for full_name, field_name, category_param in categories:
+            filename = f"{feed_slug(field_name, category_param)}.xml"
+            entry = self._feeds.get(filename) or {"items": None, "bytes": None, "siblings": [], "updated": None}
+            feeds[filename] = dict(entry, name=full_name, field=field_name, category=category_param)
+        for spec in aggregates:
+            filename = f"{spec.slug}.xml"
+            entry = self._feeds.get(filename) or {"items": None, "bytes": None, "siblings": [], "updated": None}
+            feeds[filename] = dict(entry, name=spec.name, field=spec.field, category=None, aggregate=True)
+        redirects = {legacy: target for legacy, target in self._redirects.items() if target in feeds}
+        if feeds != self._feeds or redirects != self._redirects or self._index != INDEX_FILENAME:
+            self._feeds = feeds
+            self._redirects = redirects
+            self._index = INDEX_FILENAME
+            self._dirty = True
+
+    def add_redirect(self, legacy_filename: str, target_filename: str) -> None:
+        self._redirects[legacy_filename] = target_filename
+        self._dirty = True
+
+    def feeds(self) -> Dict[str, dict]:
+        """Alle Feeds des Ausgabeverzeichnisses, sortiert nach Dateiname."""
+        return dict(sorted(self._feeds.items()))
+
+    def redirects(self) -> Dict[str, str]:
+        return dict(sorted(self._redirects.items()))
+
+    def owned_files(self) -> Set[str]:
+        """Dateinamen, die zum aktuellen Stand gehören: Feeds mit Geschwistern, Index-Seite, Weiterleitungen."""
+        owned = set(self._feeds) | set(self._redirects)
+        for entry in self._feeds.values():
+            owned.update(entry.get("siblings", ()))
+        if self._index:
+            owned.add(self._index)
+        return owned
+
+    def legacy_names(self) -> Dict[str, str]:
+        """Frühere Dateinamen (siehe legacy_feed_slugs) je Feed, z.B. {'clinicalmedicine.xml': 'clinical_medicine.xml'}."""
+        names = {}
+        for filename, entry in self._feeds.items():
+            if entry.get("aggregate"):
+                continue
+            for slug in legacy_feed_slugs(entry["field"], entry.get("category")):
+                names.setdefault(f"{slug}.xml", filename)
+        return names
+
+    def changes(self, filenames: Optional[Iterable[str]] = None) -> Dict[str, dict]:
+        """Die in diesem Lauf geschriebenen Feeds (optional nur filenames), z.B. für das Zusammenführen von Shards."""
+        selected = self._changed if filenames is None else self._changed.intersection(filenames)
+        return {filename: self._feeds[filename] for filename in sorted(selected) if filename in self._feeds}
+
+    def apply(self, changes: Dict[str, dict]) -> None:
+        """Übernimmt die Änderungen eines anderen Laufs (siehe changes)."""
+        for filename, entry in changes.items():
+            self._feeds[filename] = entry
+            self._redirects.pop(filename, None)
+            self._changed.add(filename)
+        if changes:
+            self._dirty = True
+
+    def save(self) -> None:
+        """Schreibt das Manifest atomar, falls sich etwas geändert hat."""
+        if not self._dirty:
+            return
+        manifest_dir = os.path.dirname(self.manifest_path)
+        if manifest_dir and not os.path.exists(manifest_dir):
+            os.makedirs(manifest_dir)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": MANIFEST_VERSION,
+                "index": self._index,
+                "feeds": self.feeds(),
+                "redirects": self.redirects(),
+            }, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.manifest_path)
+        self._dirty = False
+
+
+def find_orphans(output_dir: str, manifest: FeedManifest) -> List[str]:
+    """
+    Feed-Dateien im Ausgabeverzeichnis, die nicht im Manifest stehen: Dateien mit einer Endung aus
+    FEED_SUFFIXES sowie '.json'/'.ndjson', deren Name zu einem aktuellen Feed, einem früheren
+    Dateinamen (siehe legacy_names) oder einem verwaisten '<feed>.xml' gehört. Andere JSON-Dateien
+    im Verzeichnis (z.B. von Hand abgelegte Daten) bleiben unberührt.
+    """
+    if not os.path.exists(output_dir):
+        return []
+    owned = manifest.owned_files()
+    files = [entry.name for entry in os.scandir(output_dir) if entry.is_file()]
+    orphans = [name for name in files if name.endswith(FEED_SUFFIXES) and name not in owned]
+
+    feed_names = set(manifest.feeds()) | set(manifest.legacy_names()) | set(manifest.redirects())
+    feed_names.update(name for name in orphans if name.endswith(".xml"))
+    stems = {os.path.splitext(name)[0] for name in feed_names}
+    orphans += [
+        name for name in files
+        if name.endswith(STRUCTURED_FEED_SUFFIXES) and name not in owned and os.path.splitext(name)[0] in stems
+    ]
+    return sorted(orphans)
@@ -0,0 +1,164 @@
+"""
+Feed Scan
+Liest RSS-Feeds speicherschonend per iterparse, verteilt das Parsen auf einen
+Prozess-Pool und merkt sich die Ergebnisse je Datei (Pfad, mtime, Größe) in
+einem Index, damit unveränderte Feeds nicht erneut geparst werden
+"""
+
+import json
+import os
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Optional
+
+# Ab dieser Anzahl zu parsender Dateien lohnt sich der Start eines Prozess-Pools
+PARALLEL_THRESHOLD = 8
+INDEX_VERSION = 1
+
+
+def scan_feed(feed_path: str) -> dict:
+    """
+    Parst einen Feed mit iterparse und gibt Kennzahlen und Struktur-Prüfung zurück.
+    Jedes <item> wird nach der Auswertung aus dem Baum entfernt, der Speicherbedarf
+    bleibt daher unabhängig von der Anzahl der Items.
+    """
+    result = {
+        "total_items": 0,
+        "new_items": 0,
+        "title": None,
+        "last_updated": None,
+        "parse_error": None,
+        "validation_error": None,
+    }
+
+    path = []
+    channel = None
+    root_tag = None
+    has_channel = False
+    try:
+        for event, elem in ET.iterparse(feed_path, events=("start", "end")):
+            if event == "start":
+                if root_tag is None:
+                    root_tag = elem.tag
+                elif len(path) == 1 and elem.tag == "channel" and not has_channel:
+                    has_channel = True
+                    channel = elem
+                path.append(elem)
+                continue
+
+            path.pop()
+            parent = path[-1] if path else None
+            if parent is None or parent is not channel:
+                continue
+
+            if elem.tag == "item":
+                result["total_items"] += 1
+                title = elem.find("title")
+                if title is not None and title.text and '🆕' in title.text:
+                    result["new_items"] += 1
+                channel.remove(elem)
+            elif elem.tag == "title" and result["title"] is None:
+                result["title"] = elem.text
+            elif elem.tag == "lastBuildDate" and result["last_updated"] is None:
+                result["last_updated"] = elem.text
+    except ET.ParseError as e:
+        result["parse_error"] = str(e)
+        return result
+
+    if root_tag != "rss":
+        result["validation_error"] = "Kein gültiger RSS-Feed (fehlendes <rss> Element)"
+    elif not has_channel:
+        result["validation_error"] = "Kein <channel> Element gefunden"
+    elif not result["title"]:
+        result["validation_error"] = "Kein Titel gefunden"
+    return result
+
+
+class FeedScanner:
+    def __init__(self, rss_dir: str, index_path: Optional[str] = None, max_workers: Optional[int] = None):
+        """
+        Args:
+            rss_dir: Verzeichnis mit den XML-Feeds
+            index_path: Sidecar-Index mit zwischengespeicherten Ergebnissen, Standard '<rss_dir>/.history/scan_index.json'
+            max_workers: Anzahl Prozesse für das Parsen (Standard: Anzahl CPUs)
+        """
+        self.rss_dir = rss_dir
+        self.index_path = index_path or os.path.join(rss_dir, ".history", "scan_index.json")
+        self.max_workers = max_workers
+        self.parsed = 0
+        self.cached = 0
+
+    def _load_index(self) -> Dict[str, dict]:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if index.get("version") != INDEX_VERSION:
+            return {}
+        return index.get("feeds", {})
+
+    def _save_index(self, feeds: Dict[str, dict]) -> None:
+        index_dir = os.path.dirname(self.index_path)
+        try:
+            if index_dir and not os.path.exists(index_dir):
+                os.makedirs(index_dir)
+            tmp_path = f"{self.index_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": INDEX_VERSION, "feeds": feeds}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"WARNUNG: Scan-Index '{self.index_path}' konnte nicht geschrieben werden: {e}")
+
+    def _list_feeds(self, filenames: Optional[Iterable[str]]) -> Iterable[tuple]:
+        """(Dateiname, stat) aller zu prüfenden Feeds, sortiert nach Dateiname."""
+        if filenames is None:
+            for entry in sorted(os.scandir(self.rss_dir), key=lambda e: e.name):
+                if entry.name.endswith('.xml') and entry.is_file():
+                    yield entry.name, entry.stat()
+            return
+        for filename in sorted(filenames):
+            try:
+                yield filename, os.stat(os.path.join(self.rss_dir, filename))
+            except OSError:
+                continue # Im Manifest eingetragen, aber (noch) nicht geschrieben
+
+    def scan(self, filenames: Optional[Iterable[str]] = None) -> Dict[str, dict]:
+        """
+        Liefert die Scan-Ergebnisse aller '.xml'-Dateien in rss_dir, sortiert nach Dateiname.
+        Nur neue oder seit dem letzten Scan geänderte Dateien werden geparst.
+
+        Args:
+            filenames: Nur diese Feeds prüfen (z.B. aus dem Manifest), statt das Verzeichnis zu durchsuchen
+        """
+        if not os.path.exists(self.rss_dir):
+            return {}
+
+        index = self._load_index()
+        results: Dict[str, dict] = {}
+        to_scan = []
+
+        for filename, stat in self._list_feeds(filenames):
+            cached = index.get(filename)
+            if cached and cached["mtime_ns"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+                results[filename] = cached
+                self.cached += 1
+            else:
+                results[filename] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+                to_scan.append(filename)
+
+        paths = [os.path.join(self.rss_dir, filename) for filename in to_scan]
+        if len(paths) >= PARALLEL_THRESHOLD and self.max_workers != 1:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                scanned = list(executor.map(scan_feed, paths, chunksize=4))
+        else:
+            scanned = [scan_feed(path) for path in paths]
+
+        for filename, result in zip(to_scan, scanned):
+            results[filename]["result"] = result
+            self.parsed += 1
+
+        if to_scan or set(index) != set(results):
+            self._save_index(results)
+
+        return {filename: dict(data["result"], file_size=data["size"]) for filename, data in results.items()}
@@ -0,0 +1,87 @@
+"""
+Feed State
+Speichert pro Feed einen Fingerabdruck der OOIR-Rangliste, damit unveränderte
+Feeds bei einem Lauf nicht neu angereichert und geschrieben werden müssen
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# (DOI, Rang, Score), ggf. ergänzt um weitere Angaben, die den Inhalt des Items bestimmen
+EntryKey = Tuple[str, ...]
+
+
+def entry_key(article: dict) -> EntryKey:
+    """Schlüssel eines Artikels in der Rangliste: (DOI, Rang, Score)."""
+    return (str(article.get("doi", "N/A")), str(article.get("rank", "")), str(article.get("score", "")))
+
+
+def feed_fingerprint(title: str, entries: List[EntryKey]) -> str:
+    """Fingerabdruck über Feed-Titel und die geordnete Liste aus DOI, Rang und Score."""
+    payload = json.dumps([title, entries], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class FeedStateStore:
+    def __init__(self, state_path: str):
+        """
+        Args:
+            state_path: Pfad zur JSON-Datei mit den Fingerabdrücken aller Feeds
+        """
+        self.state_path = state_path
+        self._state: Dict[str, dict] = {}
+        self._changed: Set[str] = set()
+        self._dirty = False
+
+        if os.path.exists(state_path):
+            try:
+                with open(state_path, "r", encoding="utf-8") as f:
+                    self._state = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"WARNUNG: Feed-Status '{state_path}' konnte nicht gelesen werden, alle Feeds werden neu erstellt: {e}")
+
+    def get(self, feed_key: str) -> Optional[Tuple[str, List[EntryKey]]]:
+        """Gibt (Fingerabdruck, Einträge) des letzten geschriebenen Stands zurück."""
+        state = self._state.get(feed_key)
+        if not state:
+            return None
+        return state["fingerprint"], [tuple(entry) for entry in state["entries"]]
+
+    def render_options(self, feed_key: str) -> str:
+        """Ausgabe-Optionen, mit denen der Feed zuletzt geschrieben wurde ("" für die Standardausgabe)."""
+        return self._state.get(feed_key, {}).get("render", "")
+
+    def update(self, feed_key: str, fingerprint: str, entries: List[EntryKey], render_options: str = "") -> None:
+        self._state[feed_key] = {"fingerprint": fingerprint, "entries": [list(entry) for entry in entries]}
+        if render_options:
+            self._state[feed_key]["render"] = render_options
+        self._changed.add(feed_key)
+        self._dirty = True
+
+    def changes(self, feed_keys: Optional[Iterable[str]] = None) -> Dict[str, dict]:
+        """Die in diesem Lauf aktualisierten Feeds (optional nur feed_keys), z.B. für das Zusammenführen von Shards."""
+        selected = self._changed if feed_keys is None else self._changed.intersection(feed_keys)
+        return {feed_key: self._state[feed_key] for feed_key in sorted(selected)}
+
+    def apply(self, changes: Dict[str, dict]) -> None:
+        """Übernimmt die Änderungen eines anderen Laufs (siehe changes)."""
+        for feed_key, state in changes.items():
+            self._state[feed_key] = state
+            self._changed.add(feed_key)
+        if changes:
+            self._dirty = True
+
+    def save(self) -> None:
+        """Schreibt den Status atomar, falls sich etwas geändert hat."""
+        if not self._dirty:
+            return
+        state_dir = os.path.dirname(self.state_path)
+        if state_dir and not os.path.exists(state_dir):
+            os.makedirs(state_dir)
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._state, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.state_path)
+        self._dirty = False
@@ -0,0 +1,113 @@
+"""
+Feed Summary
+Vorberechnete Kennzahlen aller Feeds (Items, neue Items, letzte Aktualisierung, Größe),
+die der Monitor am Ende jedes Laufs nach '.history/feed_summary.json' schreibt.
+'feed_manager.py stats' liest nur diese Datei und prüft Größe und mtime der Feeds per
+os.stat, statt jeden Feed zu parsen. Das Modul importiert bewusst nur os und json,
+damit der Aufruf aus Cron-Jobs schnell startet.
+"""
+
+import json
+import os
+from typing import Dict, Optional, Set
+
+SUMMARY_VERSION = 2
+SUMMARY_FILENAME = "feed_summary.json"
+
+
+def summary_path(output_dir: str) -> str:
+    return os.path.join(output_dir, ".history", SUMMARY_FILENAME)
+
+
+def _xml_files(output_dir: str) -> Set[str]:
+    try:
+        return {entry.name for entry in os.scandir(output_dir) if entry.name.endswith(".xml") and entry.is_file()}
+    except OSError:
+        return set()
+
+
+def write_summary(output_dir: str, feeds: Dict[str, dict]) -> Optional[str]:
+    """
+    Schreibt die Kennzahlen der Feeds aus dem Manifest. Feeds ohne vermerkte Kennzahlen
+    (Manifest eines älteren Laufs) oder mit abweichender Dateigröße werden einmalig geparst.
+    Weitere XML-Dateien im Verzeichnis (Weiterleitungen, verwaiste Feeds) werden nur mit
+    Namen vermerkt, damit später hinzugekommene Dateien erkannt werden.
+
+    Args:
+        output_dir: Ausgabeverzeichnis des Monitors
+        feeds: Manifest-Einträge je Dateiname (siehe FeedManifest.feeds)
+
+    Returns:
+        Pfad der geschriebenen Datei
+    """
+    summary = {}
+    for filename, entry in feeds.items():
+        try:
+            stat = os.stat(os.path.join(output_dir, filename))
+        except OSError:
+            continue # Feed fehlt, 'stats' fällt dann auf den Scan zurück
+        result = {
+            "title": f"OOIR Trends: {entry['name']}" if entry.get("name") else None,
+            "total_items": entry.get("items"),
+            "new_items": entry.get("new_items"),
+            "last_updated": entry.get("last_build"),
+        }
+        if None in result.values() or entry.get("bytes") != stat.st_size:
+            from feed_scan import scan_feed # Nur für Feeds ohne Kennzahlen im Manifest
+            scanned = scan_feed(os.path.join(output_dir, filename))
+            if scanned["parse_error"]:
+                continue
+            result = {key: scanned[key] for key in result}
+        result.update(file_size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+        summary[filename] = result
+
+    path = summary_path(output_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "version": SUMMARY_VERSION,
+            "feeds": summary,
+            # Nicht lesbare Feeds stehen weder hier noch unter feeds, 'stats' scannt dann selbst
+            "other_files": sorted(_xml_files(output_dir) - set(feeds)),
+        }, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_summary(output_dir: str) -> Optional[Dict[str, dict]]:
+    """
+    Liest die Kennzahlen in der Form von FeedScanner.scan.
+
+    Returns:
+        Ergebnis je Dateiname, None wenn die Datei fehlt oder ein Feed seit dem Lauf
+        geändert, gelöscht oder hinzugefügt wurde (dann ist ein Scan nötig)
+    """
+    try:
+        with open(summary_path(output_dir), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != SUMMARY_VERSION:
+        return None
+    if _xml_files(output_dir) != set(data["feeds"]) | set(data["other_files"]):
+        return None
+
+    results = {}
+    for filename, entry in data["feeds"].items():
+        try:
+            stat = os.stat(os.path.join(output_dir, filename))
+        except OSError:
+            return None
+        if stat.st_size != entry["file_size"] or stat.st_mtime_ns != entry["mtime_ns"]:
+            return None
+        results[filename] = {
+            "total_items": entry["total_items"],
+            "new_items": entry["new_items"],
+            "title": entry["title"],
+            "last_updated": entry["last_updated"],
+            "parse_error": None,
+            "validation_error": None,
+            "file_size": entry["file_size"],
+        }
+    return results
@@ -0,0 +1,159 @@
+"""
+History Store
+Indizierter SQLite-Speicher für die Verlaufsdaten der Feeds (bekannte Papers je Feed).
+Ersetzt die früheren '*_history.pkl'-Dateien, die bei jedem Zugriff vollständig
+geladen und neu geschrieben werden mussten.
+"""
+
+import json
+import os
+import pickle
+import sqlite3
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+LEGACY_SUFFIX = "_history.pkl"
+
+
+def _normalize_date(value) -> str:
+    """Bringt Datumsangaben in ISO-Form, damit sie als Text korrekt sortiert und verglichen werden."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if value:
+        try:
+            return datetime.fromisoformat(str(value)).isoformat()
+        except ValueError:
+            pass
+    return ""
+
+
+class HistoryStore:
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path: Pfad zur SQLite-Datei, z.B. '<rss_dir>/.history/history.sqlite'
+        """
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        self._conn = sqlite3.connect(db_path)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS papers (
+                feed TEXT NOT NULL,
+                paper_hash TEXT NOT NULL,
+                added_date TEXT NOT NULL,
+                data TEXT,
+                PRIMARY KEY (feed, paper_hash)
+            );
+            CREATE INDEX IF NOT EXISTS idx_papers_added_date ON papers (added_date);
+            CREATE TABLE IF NOT EXISTS feeds (
+                feed TEXT PRIMARY KEY,
+                last_updated TEXT
+            );
+        """)
+        self._conn.commit()
+
+    def is_known(self, feed: str, paper_hash: str) -> bool:
+        """Prüft über den Primärschlüssel, ob ein Paper im Feed bereits bekannt ist."""
+        row = self._conn.execute(
+            "SELECT 1 FROM papers WHERE feed = ? AND paper_hash = ?", (feed, paper_hash)
+        ).fetchone()
+        return row is not None
+
+    def add_papers(self, feed: str, papers: Iterable[dict], last_updated: Optional[str] = None) -> int:
+        """
+        Fügt Papers (mit '_hash' und '_added_date') zur Historie eines Feeds hinzu.
+
+        Returns:
+            Anzahl neu aufgenommener Papers
+        """
+        rows = [
+            (feed, paper.get("_hash", ""), _normalize_date(paper.get("_added_date")),
+             json.dumps(paper, ensure_ascii=False, default=str))
+            for paper in papers if paper.get("_hash")
+        ]
+        with self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO papers (feed, paper_hash, added_date, data) VALUES (?, ?, ?, ?)", rows
+            )
+            added = self._conn.total_changes - before
+            self._conn.execute(
+                "INSERT OR REPLACE INTO feeds (feed, last_updated) VALUES (?, ?)",
+                (feed, _normalize_date(last_updated) or datetime.now().isoformat())
+            )
+        return added
+
+    def feed_summaries(self) -> Dict[str, Tuple[int, str]]:
+        """Gibt je Feed (Anzahl bekannter Papers, letzte Aktualisierung) zurück."""
+        summaries = {
+            feed: (0, last_updated or "Unbekannt")
+            for feed, last_updated in self._conn.execute("SELECT feed, last_updated FROM feeds")
+        }
+        for feed, count in self._conn.execute("SELECT feed, COUNT(*) FROM papers GROUP BY feed"):
+            summaries[feed] = (count, summaries.get(feed, (0, "Unbekannt"))[1])
+        return summaries
+
+    def delete_older_than(self, cutoff: datetime) -> Dict[str, int]:
+        """
+        Entfernt alle Papers, die vor cutoff aufgenommen wurden, mit einem einzigen
+        Bereichs-Delete über den Index auf added_date.
+
+        Returns:
+            Anzahl entfernter Papers je Feed
+        """
+        cutoff_str = cutoff.isoformat()
+        with self._conn:
+            removed = dict(self._conn.execute(
+                "SELECT feed, COUNT(*) FROM papers WHERE added_date != '' AND added_date < ? GROUP BY feed", (cutoff_str,)
+            ).fetchall())
+            self._conn.execute("DELETE FROM papers WHERE added_date != '' AND added_date < ?", (cutoff_str,))
+        return removed
+
+    def reset(self, feed: str) -> bool:
+        """Löscht die komplette Historie eines Feeds. Gibt zurück, ob Daten vorhanden waren."""
+        with self._conn:
+            papers = self._conn.execute("DELETE FROM papers WHERE feed = ?", (feed,)).rowcount
+            feeds = self._conn.execute("DELETE FROM feeds WHERE feed = ?", (feed,)).rowcount
+        return bool(papers or feeds)
+
+    def migrate_pickle_files(self, history_dir: str) -> int:
+        """
+        Übernimmt vorhandene '*_history.pkl'-Dateien einmalig in die Datenbank und benennt
+        sie anschließend in '*.pkl.migrated' um.
+
+        Returns:
+            Anzahl migrierter Dateien
+        """
+        if not os.path.isdir(history_dir):
+            return 0
+
+        migrated = 0
+        for filename in os.listdir(history_dir):
+            if not filename.endswith(LEGACY_SUFFIX):
+                continue
+            history_path = os.path.join(history_dir, filename)
+            try:
+                with open(history_path, 'rb') as f:
+                    history = pickle.load(f)
+            except (pickle.PickleError, EOFError, OSError) as e:
+                print(f"❌ Fehler beim Migrieren von {filename}: {e}")
+                continue
+
+            feed = filename[:-len(LEGACY_SUFFIX)]
+            papers = list(history.get("papers_data", []))
+            # Bekannte Hashes ohne Paper-Daten bleiben ebenfalls bekannt
+            known_with_data = {paper.get("_hash") for paper in papers}
+            papers.extend({"_hash": paper_hash} for paper_hash in history.get("known_papers", set())
+                          if paper_hash and paper_hash not in known_with_data)
+            self.add_papers(feed, papers, last_updated=history.get("last_updated"))
+
+            os.replace(history_path, history_path + ".migrated")
+            migrated += 1
+            print(f"📦 {filename} in die Verlaufsdatenbank übernommen")
+        return migrated
+
+    def close(self) -> None:
+        self._conn.close()
@@ -0,0 +1,195 @@
+"""
+HTTP Transport
+Gemeinsame HTTP-Schicht für OOIR und Crossref mit Connection-Pooling pro Host,
+Wiederholungsversuchen mit exponentiellem Backoff und Parallelitätsgrenzen pro Host
+"""
+
+import email.utils
+import random
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from http_validators import ValidatorStore
+from instrumentation import RunMetrics
+
+# Statuscodes, bei denen ein erneuter Versuch sinnvoll ist
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class HttpTransport:
+    def __init__(self, max_retries: int = 4, backoff_factor: float = 0.5, max_backoff: float = 60.0,
+                 pool_size: int = 10, host_concurrency: Optional[Dict[str, int]] = None,
+                 default_host_concurrency: int = 4, validator_store: Optional[ValidatorStore] = None,
+                 metrics: Optional[RunMetrics] = None):
+        """
+        Args:
+            max_retries: Anzahl zusätzlicher Versuche bei 429/5xx-Antworten und Verbindungsfehlern
+            backoff_factor: Basiswartezeit in Sekunden, verdoppelt sich mit jedem Versuch
+            max_backoff: Obergrenze für eine einzelne Wartezeit (auch für Retry-After)
+            pool_size: Maximale Anzahl offener Keep-Alive-Verbindungen pro Host
+            host_concurrency: Maximale gleichzeitige Anfragen pro Host, z.B. {"api.crossref.org": 3}
+            default_host_concurrency: Grenze für Hosts ohne eigenen Eintrag in host_concurrency
+            validator_store: Speicher für ETag/Last-Modified, ermöglicht bedingte Anfragen (If-None-Match/If-Modified-Since)
+            metrics: Erfasst die Latenz jeder einzelnen Anfrage (auch Wiederholungen) pro Host
+        """
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.pool_size = pool_size
+        self.host_concurrency = dict(host_concurrency or {})
+        self.default_host_concurrency = default_host_concurrency
+        self.validator_store = validator_store
+        self.metrics = metrics
+
+        self.requests_sent = 0
+        self.retries = 0
+        self.throttled = 0
+        self.revalidated = 0
+
+        self._sessions: Dict[str, requests.Session] = {}
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _session_for(self, host: str) -> requests.Session:
+        """Gibt die Session des Hosts zurück, damit TCP- und TLS-Verbindungen wiederverwendet werden."""
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[host] = session
+            return session
+
+    def _semaphore_for(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                limit = self.host_concurrency.get(host, self.default_host_concurrency)
+                semaphore = threading.BoundedSemaphore(max(1, limit))
+                self._semaphores[host] = semaphore
+            return semaphore
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Exponentielles Backoff mit "Full Jitter", damit parallele Worker nicht synchron erneut anfragen."""
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * (2 ** attempt)))
+
+    def _retry_after_delay(self, response: requests.Response) -> Optional[float]:
+        """Wertet den Retry-After-Header aus (Sekunden oder HTTP-Datum)."""
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            delay = float(value)
+        except ValueError:
+            try:
+                retry_at = email.utils.parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                return None
+            delay = retry_at.timestamp() - time.time()
+        return min(self.max_backoff, max(0.0, delay))
+
+    def get(self, url: str, params: Optional[dict] = None, headers: Optional[dict] = None,
+            timeout: float = 30, cache_key: Optional[str] = None) -> requests.Response:
+        """
+        Führt eine GET-Anfrage über die gepoolte Session des Hosts aus.
+        Bei 429/5xx und Verbindungsfehlern wird mit Backoff erneut versucht; ist die
+        Anzahl der Versuche erschöpft, wird die letzte Antwort zurückgegeben bzw. der
+        letzte Fehler ausgelöst.
+
+        Mit cache_key wird die Anfrage bedingt gestellt, sofern Validatoren einer früheren
+        Antwort vorliegen. Eine 304-Antwort wird dann als 200-Antwort mit dem lokal
+        gespeicherten Inhalt zurückgegeben.
+        """
+        stored = None
+        if cache_key and self.validator_store is not None:
+            stored = self.validator_store.get(cache_key)
+            if stored is not None:
+                headers = dict(headers or {})
+                etag, last_modified, _ = stored
+                if etag:
+                    headers["If-None-Match"] = etag
+                if last_modified:
+                    headers["If-Modified-Since"] = last_modified
+
+        response = self._get_with_retries(url, params=params, headers=headers, timeout=timeout)
+
+        if stored is not None and response.status_code == 304:
+            self._count("revalidated")
+            self.validator_store.touch(cache_key)
+            return self._response_from_store(response, stored[2])
+
+        if cache_key and self.validator_store is not None and response.status_code == 200:
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if etag or last_modified:
+                self.validator_store.put(cache_key, etag, last_modified, response.content)
+
+        return response
+
+    def _response_from_store(self, not_modified: requests.Response, body: bytes) -> requests.Response:
+        """Baut aus einer 304-Antwort und dem gespeicherten Inhalt eine vollständige Antwort."""
+        response = requests.Response()
+        response.status_code = 200
+        response.headers = CaseInsensitiveDict(not_modified.headers)
+        response.url = not_modified.url
+        response.request = not_modified.request
+        response.encoding = "utf-8"
+        response._content = body
+        response._content_consumed = True
+        return response
+
+    def _get_with_retries(self, url: str, params: Optional[dict], headers: Optional[dict],
+                          timeout: float) -> requests.Response:
+        host = urlparse(url).netloc
+        session = self._session_for(host)
+        semaphore = self._semaphore_for(host)
+
+        attempt = 0
+        while True:
+            try:
+                with semaphore:
+                    self._count("requests_sent")
+                    start = time.perf_counter()
+                    try:
+                        response = session.get(url, params=params, headers=headers, timeout=timeout)
+                    finally:
+                        if self.metrics is not None:
+                            self.metrics.observe_latency(host, time.perf_counter() - start)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff_delay(attempt)
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    return response
+                if response.status_code == 429:
+                    self._count("throttled")
+                delay = self._retry_after_delay(response)
+                if delay is None:
+                    delay = self._backoff_delay(attempt)
+                response.close()
+
+            self._count("retries")
+            attempt += 1
+            time.sleep(delay)
+
+    def close(self) -> None:
+        """Schließt alle offenen Verbindungen und den Validator-Speicher."""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+        if self.validator_store is not None:
+            self.validator_store.close()
@@ -0,0 +1,85 @@
+"""
+HTTP Validators
+Speichert ETag, Last-Modified und den zuletzt erhaltenen Inhalt pro Anfrage-Schlüssel,
+damit Anfragen bedingt gestellt und 304-Antworten lokal bedient werden können
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple
+
+DEFAULT_MAX_ENTRIES = 20000
+
+
+class ValidatorStore:
+    def __init__(self, db_path: str, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            db_path: Pfad zur SQLite-Datei
+            max_entries: Maximale Anzahl gespeicherter Antworten, die ältesten werden zuerst verdrängt
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS http_validators (
+                request_key TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body BLOB NOT NULL,
+                validated_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_http_validators_validated_at ON http_validators (validated_at)")
+        self._conn.commit()
+
+    def get(self, request_key: str) -> Optional[Tuple[Optional[str], Optional[str], bytes]]:
+        """Gibt (ETag, Last-Modified, Inhalt) der zuletzt gespeicherten Antwort zurück."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, body FROM http_validators WHERE request_key = ?", (request_key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1], bytes(row[2])
+
+    def put(self, request_key: str, etag: Optional[str], last_modified: Optional[str], body: bytes) -> None:
+        """Speichert Validatoren und Inhalt einer vollständigen (200) Antwort."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO http_validators (request_key, etag, last_modified, body, validated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (request_key, etag, last_modified, sqlite3.Binary(body), time.time())
+            )
+            self._conn.commit()
+
+    def touch(self, request_key: str) -> None:
+        """Markiert eine per 304 bestätigte Antwort als aktuell."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE http_validators SET validated_at = ? WHERE request_key = ?", (time.time(), request_key)
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Verdrängt die ältesten Einträge oberhalb von max_entries und schließt die Datenbank."""
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM http_validators").fetchone()[0]
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM http_validators WHERE request_key IN "
+                    "(SELECT request_key FROM http_validators ORDER BY validated_at ASC LIMIT ?)", (overflow,)
+                )
+                self._conn.commit()
+            self._conn.close()
@@ -0,0 +1,196 @@
+"""
+Instrumentation
+Zeitmessung pro Pipeline-Stufe, Latenz-Histogramme pro Host und Zähler eines Laufs.
+Die Ergebnisse werden als JSON-Laufbericht und optional als Prometheus-Textfile geschrieben.
+"""
+
+import contextlib
+import datetime
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+# Obergrenzen der Latenz-Buckets in Sekunden (kumulativ wie bei Prometheus)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class RunMetrics:
+    def __init__(self):
+        self.started_at = datetime.datetime.now(datetime.timezone.utc)
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, float]] = {}
+        self._latencies: Dict[str, Dict[str, object]] = {}
+        self._counters: Dict[str, float] = {}
+        self._outputs: Dict[str, Dict[str, int]] = {}
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Misst die Dauer eines Abschnitts und summiert sie pro Stufe (threadsicher)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                stage = self._stages.setdefault(name, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+                stage["count"] += 1
+                stage["total_seconds"] += elapsed
+                stage["max_seconds"] = max(stage["max_seconds"], elapsed)
+
+    def observe_latency(self, host: str, seconds: float) -> None:
+        """Erfasst die Dauer einer HTTP-Anfrage im Histogramm des Hosts."""
+        with self._lock:
+            histogram = self._latencies.setdefault(host, {
+                "count": 0, "sum_seconds": 0.0, "buckets": [0] * len(LATENCY_BUCKETS),
+            })
+            histogram["count"] += 1
+            histogram["sum_seconds"] += seconds
+            for index, upper_bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= upper_bound:
+                    histogram["buckets"][index] += 1
+
+    def increment(self, counter: str, amount: float = 1) -> None:
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + amount
+
+    def set(self, counter: str, value: float) -> None:
+        with self._lock:
+            self._counters[counter] = value
+
+    def record_output(self, name: str, sizes: Dict[str, int]) -> None:
+        """Merkt sich die Dateigrößen einer Ausgabe, z.B. {"xml": 81234, "gz": 9876}."""
+        with self._lock:
+            self._outputs[name] = dict(sizes)
+
+    def report(self) -> dict:
+        """Gibt alle Messwerte als JSON-serialisierbares Dictionary zurück."""
+        with self._lock:
+            return {
+                "started_at": self.started_at.isoformat(),
+                "duration_seconds": round(time.perf_counter() - self._started, 6),
+                "stages": {
+                    name: {
+                        "count": int(stage["count"]),
+                        "total_seconds": round(stage["total_seconds"], 6),
+                        "max_seconds": round(stage["max_seconds"], 6),
+                    }
+                    for name, stage in sorted(self._stages.items())
+                },
+                "http_latency": {
+                    host: {
+                        "count": histogram["count"],
+                        "sum_seconds": round(histogram["sum_seconds"], 6),
+                        "buckets": {str(bound): count for bound, count in zip(LATENCY_BUCKETS, histogram["buckets"])},
+                    }
+                    for host, histogram in sorted(self._latencies.items())
+                },
+                "counters": dict(sorted(self._counters.items())),
+                "outputs": dict(sorted(self._outputs.items())),
+            }
+
+    def write_json(self, path: str, extra: Optional[dict] = None) -> None:
+        """Schreibt den Laufbericht als JSON-Datei."""
+        report = self.report()
+        if extra:
+            report.update(extra)
+        write_report_json(path, report)
+
+    def write_prometheus(self, path: str, prefix: str = "ooir_rss") -> None:
+        """Schreibt die Messwerte im Textformat für den Textfile-Collector des node_exporter."""
+        write_report_prometheus(path, self.report(), prefix=prefix)
+
+
+def merge_reports(reports: List[dict]) -> dict:
+    """
+    Fasst die Laufberichte mehrerer Shards zu einem Bericht zusammen: Stufen, Histogramme
+    und Zähler werden summiert, die Laufzeit ist die des langsamsten Shards.
+    Trefferquoten (Zähler mit Endung '_rate') werden aus den summierten Zählern neu berechnet.
+    """
+    merged: dict = {
+        "started_at": min((report["started_at"] for report in reports), default=None),
+        "duration_seconds": max((report["duration_seconds"] for report in reports), default=0.0),
+        "stages": {},
+        "http_latency": {},
+        "counters": {},
+        "outputs": {},
+    }
+    for report in reports:
+        merged["outputs"].update(report.get("outputs", {}))
+        for name, stage in report.get("stages", {}).items():
+            target = merged["stages"].setdefault(name, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+            target["count"] += stage["count"]
+            target["total_seconds"] = round(target["total_seconds"] + stage["total_seconds"], 6)
+            target["max_seconds"] = max(target["max_seconds"], stage["max_seconds"])
+        for host, histogram in report.get("http_latency", {}).items():
+            target = merged["http_latency"].setdefault(host, {
+                "count": 0, "sum_seconds": 0.0, "buckets": {str(bound): 0 for bound in LATENCY_BUCKETS},
+            })
+            target["count"] += histogram["count"]
+            target["sum_seconds"] = round(target["sum_seconds"] + histogram["sum_seconds"], 6)
+            for bound, count in histogram["buckets"].items():
+                target["buckets"][bound] = target["buckets"].get(bound, 0) + count
+        for name, value in report.get("counters", {}).items():
+            if not name.endswith("_rate"):
+                merged["counters"][name] = merged["counters"].get(name, 0) + value
+
+    counters = merged["counters"]
+    if "doi_cache_hits" in counters:
+        lookups = counters["doi_cache_hits"] + counters.get("doi_cache_negative_hits", 0) + counters.get("doi_cache_misses", 0)
+        hits = counters["doi_cache_hits"] + counters.get("doi_cache_negative_hits", 0)
+        counters["doi_cache_hit_rate"] = hits / lookups if lookups else 0.0
+    merged["stages"] = dict(sorted(merged["stages"].items()))
+    merged["http_latency"] = dict(sorted(merged["http_latency"].items()))
+    merged["counters"] = dict(sorted(counters.items()))
+    merged["outputs"] = dict(sorted(merged["outputs"].items()))
+    return merged
+
+
+def write_report_json(path: str, report: dict) -> None:
+    _atomic_write(path, json.dumps(report, indent=2, ensure_ascii=False) + "\n")
+
+
+def write_report_prometheus(path: str, report: dict, prefix: str = "ooir_rss") -> None:
+    """Schreibt einen Laufbericht (siehe RunMetrics.report) im Prometheus-Textformat."""
+    lines = [
+        f"# HELP {prefix}_run_duration_seconds Dauer des letzten Laufs.",
+        f"# TYPE {prefix}_run_duration_seconds gauge",
+        f"{prefix}_run_duration_seconds {report['duration_seconds']}",
+        f"# HELP {prefix}_stage_seconds Summierte Dauer pro Pipeline-Stufe im letzten Lauf.",
+        f"# TYPE {prefix}_stage_seconds gauge",
+    ]
+    lines += [f'{prefix}_stage_seconds{{stage="{name}"}} {stage["total_seconds"]}' for name, stage in report["stages"].items()]
+    lines += [
+        f"# HELP {prefix}_stage_calls Anzahl Durchläufe pro Pipeline-Stufe im letzten Lauf.",
+        f"# TYPE {prefix}_stage_calls gauge",
+    ]
+    lines += [f'{prefix}_stage_calls{{stage="{name}"}} {stage["count"]}' for name, stage in report["stages"].items()]
+
+    lines += [
+        f"# HELP {prefix}_http_request_duration_seconds Latenz der HTTP-Anfragen pro Host.",
+        f"# TYPE {prefix}_http_request_duration_seconds histogram",
+    ]
+    for host, histogram in report["http_latency"].items():
+        for bound, count in histogram["buckets"].items():
+            lines.append(f'{prefix}_http_request_duration_seconds_bucket{{host="{host}",le="{bound}"}} {count}')
+        lines.append(f'{prefix}_http_request_duration_seconds_bucket{{host="{host}",le="+Inf"}} {histogram["count"]}')
+        lines.append(f'{prefix}_http_request_duration_seconds_sum{{host="{host}"}} {histogram["sum_seconds"]}')
+        lines.append(f'{prefix}_http_request_duration_seconds_count{{host="{host}"}} {histogram["count"]}')
+
+    for name, value in report["counters"].items():
+        lines.append(f"# TYPE {prefix}_{name} gauge")
+        lines.append(f"{prefix}_{name} {value}")
+
+    _atomic_write(path, "\n".join(lines) + "\n")
+
+
+def _atomic_write(path: str, content: str) -> None:
+    target_dir = os.path.dirname(path)
+    if target_dir and not os.path.exists(target_dir):
+        os.makedirs(target_dir)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
@@ -0,0 +1,126 @@
+"""
+JSON Feed Writer
+Schreibt neben dem RSS-Feed einen JSON Feed 1.1 (https://www.jsonfeed.org/version/1.1/)
+und eine NDJSON-Datei mit einer Zeile je Item. Beide entstehen in einem Durchgang aus
+denselben strukturierten Item-Datensätzen wie das RSS-Item (siehe _build_item_record),
+Abnehmer müssen daher weder XML parsen noch die Beschreibung wieder zerlegen.
+"""
+
+import contextlib
+import json
+import os
+import tempfile
+from typing import Dict, List, Optional
+
+from instrumentation import RunMetrics
+
+JSON_FEED_VERSION = "https://jsonfeed.org/version/1.1"
+# Erweiterungsschlüssel für die OOIR- und Crossref-Angaben (JSON Feed erlaubt eigene Schlüssel mit '_')
+EXTENSION_KEY = "_ooir"
+STRUCTURED_SUFFIXES = (".json", ".ndjson")
+
+
+def json_feed_item(record: dict, title: str, content_text: str) -> dict:
+    """Bildet einen Item-Datensatz auf ein JSON-Feed-Item ab (Titel und Text wie im RSS-Item)."""
+    item = {
+        "id": record["guid"],
+        "url": record["url"],
+        "title": title,
+        "content_text": content_text,
+        "date_published": record["date_published"],
+    }
+    if record.get("authors"):
+        item["authors"] = [{"name": name} for name in record["authors"]]
+    if record.get("category"):
+        item["tags"] = [record["category"]]
+    item[EXTENSION_KEY] = {
+        key: record[key]
+        for key in ("doi", "issn", "score", "rank", "field", "category", "day", "journal", "published", "abstract", "trend")
+        if record.get(key) is not None
+    }
+    return item
+
+
+class StructuredFeedWriter:
+    def __init__(self, path_base: str, title: str, description: str, home_page_url: str = "https://ooir.org",
+                 language: str = "en-US", compact: bool = False, metrics: Optional[RunMetrics] = None):
+        """
+        Args:
+            path_base: Zielpfad ohne Endung, geschrieben werden '<path_base>.json' und '<path_base>.ndjson'
+            compact: JSON Feed ohne Einrückung schreiben (NDJSON ist immer einzeilig je Item)
+            metrics: Misst die Stufen 'serialize' und 'write' wie StreamingRSSWriter
+        """
+        self.paths = {suffix: f"{path_base}{suffix}" for suffix in STRUCTURED_SUFFIXES}
+        self.header = {
+            "version": JSON_FEED_VERSION,
+            "title": title,
+            "home_page_url": home_page_url,
+            "description": description,
+            "language": language,
+        }
+        self.compact = compact
+        self.metrics = metrics
+        self.bytes_written: Dict[str, int] = {suffix: 0 for suffix in STRUCTURED_SUFFIXES}
+        self._files = {}
+        self._tmp_paths: Dict[str, str] = {}
+        self._items = 0
+
+    def _stage(self, name: str):
+        return self.metrics.stage(name) if self.metrics is not None else contextlib.nullcontext()
+
+    def __enter__(self) -> "StructuredFeedWriter":
+        for suffix, path in self.paths.items():
+            target_dir = os.path.dirname(os.path.abspath(path))
+            fd, self._tmp_paths[suffix] = tempfile.mkstemp(dir=target_dir, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+            self._files[suffix] = os.fdopen(fd, "wb")
+        # Der Kopf wird ohne schließende Klammer geschrieben, die Items folgen einzeln
+        if self.compact:
+            header = json.dumps(self.header, ensure_ascii=False, separators=(",", ":"))
+        else:
+            header = json.dumps(self.header, ensure_ascii=False, indent="\t")
+        self._write(".json", header[:-1].rstrip() + ("," if self.compact else ",\n\t") + '"items": [')
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is not None:
+            for suffix, f in self._files.items():
+                f.close()
+                os.remove(self._tmp_paths[suffix])
+            return
+
+        if self.compact:
+            self._write(".json", "]}\n")
+        else:
+            self._write(".json", "\n\t]\n}\n" if self._items else "]\n}\n")
+        with self._stage("write"):
+            for suffix, f in self._files.items():
+                f.close()
+                os.chmod(self._tmp_paths[suffix], 0o644)
+                os.replace(self._tmp_paths[suffix], self.paths[suffix])
+
+    def _write(self, suffix: str, text: str) -> None:
+        data = text.encode("utf-8")
+        with self._stage("write"):
+            self._files[suffix].write(data)
+        self.bytes_written[suffix] += len(data)
+
+    def write_item(self, record: dict, title: str, content_text: str) -> None:
+        """Schreibt einen Item-Datensatz als JSON-Feed-Item und als NDJSON-Zeile."""
+        with self._stage("serialize"):
+            line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+            if self.compact:
+                item = json.dumps(json_feed_item(record, title, content_text), ensure_ascii=False, separators=(",", ":"))
+            else:
+                item = "\n\t\t" + json.dumps(json_feed_item(record, title, content_text), ensure_ascii=False)
+        self._write(".json", ("," if self._items else "") + item)
+        self._write(".ndjson", line + "\n")
+        self._items += 1
+
+
+def load_records(ndjson_path: str) -> Optional[List[dict]]:
+    """Liest die Item-Datensätze einer NDJSON-Datei (None, wenn nicht vorhanden oder nicht lesbar)."""
+    try:
+        with open(ndjson_path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except (OSError, ValueError):
+        return None
@@ -1,18 +1,146 @@
 import os
+import argparse
+import copy
+import asyncio
+import contextlib
 import requests
 import json
 import datetime
+import hashlib
 import xml.etree.ElementTree as ET
 import re
-import time # Für Verzögerungen zwischen API-Aufrufen
-from typing import Optional, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
+from typing import Optional, List, Tuple, Dict, Iterable, Set
+from urllib.parse import urlparse
+
+from aggregate_feeds import DEFAULT_AGGREGATE_MAX_ITEMS, AggregateSpec, aggregate_specs, merge_ranked
+from article_record import ArticleRecord
+from async_pipeline import run_pipeline
+from category_registry import RefreshScheduler, load_categories
+from doi_cache import DOIMetadataCache
+from feed_manifest import FeedManifest
+from feed_state import FeedStateStore, EntryKey, entry_key, feed_fingerprint
+from feed_summary import write_summary
+from http_transport import HttpTransport
+from http_validators import ValidatorStore
+from instrumentation import RunMetrics
+from json_feed_writer import STRUCTURED_SUFFIXES, StructuredFeedWriter, load_records
+from rate_limiter import TokenBucket
+from rss_writer import StreamingRSSWriter
+from run_journal import RunJournal
+from sharding import merge_shards, parse_shard, select_shard, write_shard_result
+from text_normalization import feed_slug, truncate_text
+from trend_archive import TrendArchive, TrendStats
+
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "categories.json")
+
+# Felder, die _create_rss_item aus Crossref darstellt (select-Projektion der Sammelabfrage)
+CROSSREF_SELECT_FIELDS = "DOI,title,author,container-title,published,issued,abstract,URL"
+
+# Zeitstempel der Index-Seite, wird beim Vergleich mit der bestehenden Datei ignoriert
+_GENERATED_AT_PATTERN = re.compile(r"Generiert am: [^<]*")
 
 class OOIRTrendMonitor:
-    def __init__(self, email: str, output_dir: str = "docs", max_items: int = 50):
+    def __init__(self, email: str, output_dir: str = "docs", max_items: int = 50,
+                 max_workers: int = 3, crossref_rate: float = 10.0, ooir_rate: float = 1.0,
+                 metadata_cache: Optional[DOIMetadataCache] = None, transport: Optional[HttpTransport] = None,
+                 ooir_api_url: str = "https://ooir.org/v2/api.php", crossref_api_url: str = "https://api.crossref.org",
+                 metrics: Optional[RunMetrics] = None, ooir_workers: int = 2,
+                 feed_max_items: Optional[Dict[str, int]] = None, scheduler: Optional[RefreshScheduler] = None,
+                 shard: Optional[Tuple[int, int]] = None, compact: bool = False, precompress: bool = False,
+                 abstract_max_chars: Optional[int] = None, trend_archive: Optional[TrendArchive] = None,
+                 crossref_batch_size: int = 20, aggregate_feeds: bool = True,
+                 aggregate_max_items: int = DEFAULT_AGGREGATE_MAX_ITEMS, json_feed: bool = False):
+        """
+        Args:
+            email: Kontakt-E-Mail für OOIR und den Crossref "Polite Pool"
+            output_dir: Zielverzeichnis für Feeds und Index-Seite
+            max_items: Maximale Anzahl an Items pro Feed
+            max_workers: Anzahl paralleler Crossref-Abfragen (Polite Pool erlaubt wenige gleichzeitige Verbindungen)
+            crossref_rate: Maximale Crossref-Anfragen pro Sekunde über alle Threads hinweg
+            ooir_rate: Maximale OOIR-Anfragen pro Sekunde, um den Server zu entlasten
+            metadata_cache: Persistenter DOI-Cache, Standard ist '<output_dir>/.history/doi_cache.sqlite'
+            transport: HTTP-Schicht für alle API-Aufrufe (austauschbar, z.B. für einen lokalen Testserver)
+            ooir_api_url: Endpunkt der OOIR API
+            crossref_api_url: Basis-URL der Crossref API
+            metrics: Zeitmessung und Zähler des Laufs, Grundlage für Laufbericht und Prometheus-Textfile
+            ooir_workers: Anzahl paralleler OOIR-Abfragen (zusätzlich durch ooir_rate begrenzt)
+            feed_max_items: Abweichende max_items je Feed (Schlüssel wie feed_slug), z.B. aus categories.json
+            scheduler: Zeitplan der Kategorien, Standard ist '<output_dir>/.history/schedule.json'
+            shard: (i, N) im Shard-Modus: Index-Seite, Feed-Status und Zeitplan werden erst im Merge-Schritt geschrieben
+            compact: Feeds ohne Einrückung und Zeilenumbrüche schreiben
+            precompress: Zu jedem Feed '.xml.gz' und (mit dem Paket 'brotli') '.xml.br' mit derselben mtime schreiben
+            abstract_max_chars: Abstracts im Feed auf diese Länge kürzen (None = vollständig, sonst > 0)
+            trend_archive: Archiv aller Ranglisten, Standard ist '<output_dir>/.history/trend_archive.sqlite'
+            crossref_batch_size: DOIs pro Crossref-Sammelabfrage ('/works?filter=doi:...'), 1 = nur Einzelabfragen
+            aggregate_feeds: Zusätzlich Sammel-Feeds je Feld und über alle Kategorien schreiben (siehe aggregate_feeds.py)
+            aggregate_max_items: Maximale Anzahl an Items pro Sammel-Feed
+            json_feed: Zu jedem Feed zusätzlich '<feed>.json' (JSON Feed 1.1) und '<feed>.ndjson' (ein Item je Zeile) schreiben
+        """
         self.email = email
+        self.metrics = metrics or RunMetrics()
         self.output_dir = output_dir
         self.max_items = max_items
+        self.compact = compact
+        self.precompress = precompress
+        if abstract_max_chars is not None and abstract_max_chars <= 0:
+            raise ValueError("abstract_max_chars muss größer als 0 sein")
+        self.abstract_max_chars = abstract_max_chars
+        self.json_feed = json_feed
+        # Ändern sich die Ausgabe-Optionen, werden alle Feeds einmal vollständig neu geschrieben
+        self._render_options = ";".join(option for option in (
+            "compact" if compact else "",
+            "precompress" if precompress else "",
+            f"abstract={abstract_max_chars}" if abstract_max_chars else "",
+            "json" if json_feed else "",
+        ) if option)
+        self.feed_max_items = dict(feed_max_items or {})
+        self.ooir_workers = max(1, ooir_workers)
+        self.max_workers = max(1, max_workers)
+        self.crossref_batch_size = crossref_batch_size
+        self.aggregate_feeds = aggregate_feeds
+        self.aggregate_max_items = aggregate_max_items
+        # Items der in diesem Lauf geschriebenen Feeds je Eintrag, Grundlage der Sammel-Feeds. Behalten
+        # werden nur Mitglieder eines noch zu schreibenden Sammel-Feeds (siehe _plan_aggregate_members)
+        self._feed_items: Dict[str, Dict[EntryKey, ET.Element]] = {}
+        self._aggregate_members: Set[str] = set()
+        # Item-Datensätze des bisherigen NDJSON je Eintrag für wiederverwendete Items (nur mit json_feed)
+        self._reusable_records: Dict[str, Dict[EntryKey, dict]] = {}
+        self._crossref_limiter = TokenBucket(rate=crossref_rate)
+        self._ooir_limiter = TokenBucket(rate=ooir_rate)
         self._ensure_output_directory_exists()
+        if metadata_cache is None:
+            metadata_cache = DOIMetadataCache(os.path.join(self.output_dir, ".history", "doi_cache.sqlite"))
+        self.metadata_cache = metadata_cache
+        self.feed_state = FeedStateStore(os.path.join(self.output_dir, ".history", "feed_state.json"))
+        self.manifest = FeedManifest(os.path.join(self.output_dir, ".history", "manifest.json"))
+        if scheduler is None:
+            scheduler = RefreshScheduler(os.path.join(self.output_dir, ".history", "schedule.json"))
+        self.scheduler = scheduler
+        if trend_archive is None:
+            trend_archive = TrendArchive(os.path.join(self.output_dir, ".history", "trend_archive.sqlite"))
+        self.trend_archive = trend_archive
+        self._trend_stats: Dict[str, Dict[str, TrendStats]] = {}
+        self.shard = shard
+        # Journal abgeschlossener Schritte für --resume (siehe start_journal/resume_journal)
+        self.journal: Optional[RunJournal] = None
+        self.feeds_resumed = 0
+        self.feeds_skipped = 0
+        self.feeds_rebuilt = 0
+        self.items_reused = 0
+        self.ooir_api_url = ooir_api_url
+        self.crossref_api_url = crossref_api_url.rstrip("/")
+        if transport is None:
+            transport = HttpTransport(
+                host_concurrency={
+                    urlparse(ooir_api_url).netloc: self.ooir_workers,
+                    urlparse(crossref_api_url).netloc: self.max_workers,
+                },
+                validator_store=ValidatorStore(os.path.join(self.output_dir, ".history", "http_validators.sqlite")),
+                metrics=self.metrics,
+            )
+        self.transport = transport
 
     def _ensure_output_directory_exists(self):
         """Stellt sicher, dass das Ausgabe-Verzeichnis existiert."""
@@ -28,15 +156,17 @@ class OOIRTrendMonitor:
         today_str = datetime.date.today().strftime("%Y-%m-%d")
 
         # **ÄNDERUNG: Die API-Basis-URL wurde auf 'v2/api.php' aktualisiert**
-        api_url = f"https://ooir.org/v2/api.php?email={self.email}&type=paper-trends&day={today_str}&field={requests.utils.quote(field)}"
+        api_url = f"{self.ooir_api_url}?email={self.email}&type=paper-trends&day={today_str}&field={requests.utils.quote(field)}"
         
         if category:
             api_url += f"&category={requests.utils.quote(category)}"
-        
-        print(f"DEBUG: Fetching from OOIR API: {api_url}")
 
         try:
-            response = requests.get(api_url, timeout=30)
+            self._ooir_limiter.acquire()
+            # Schlüssel ohne E-Mail, damit Validatoren unabhängig von der Kontaktadresse gültig bleiben
+            cache_key = f"ooir:{today_str}:{field}:{category or ''}"
+            with self.metrics.stage("ooir_fetch"):
+                response = self.transport.get(api_url, timeout=30, cache_key=cache_key)
             response.raise_for_status()  # Löst einen HTTPError für schlechte Antworten (4xx oder 5xx) aus
             
             data = response.json()
@@ -63,29 +193,85 @@ class OOIRTrendMonitor:
                  print(f"Rohe OOIR API-Antwort, die keine gültige JSON war: {response.text}")
             return None
 
-    def _fetch_article_metadata_from_doi(self, doi: str) -> Optional[dict]:
+    def fetch_trends(self, field_name: str, category_param: Optional[str]) -> Optional[list]:
+        """OOIR-Rangliste einer Kategorie, bei einem fortgesetzten Lauf aus dem Journal statt von der API."""
+        slug = feed_slug(field_name, category_param)
+        if self.journal is not None:
+            found, papers_data = self.journal.trends(slug)
+            if found:
+                self.metrics.increment("journal_ooir_reused")
+                return papers_data
+        papers_data = self._fetch_data_from_api(field=field_name, category=category_param)
+        if self.journal is not None and papers_data is not None:
+            self.journal.record_trends(slug, papers_data)
+        return papers_data
+
+    def _max_items_for(self, field_name: str, category_param: Optional[str]) -> int:
+        return self.feed_max_items.get(feed_slug(field_name, category_param), self.max_items)
+
+    def _record_fetch(self, field_name: str, category_param: Optional[str], papers_data: Optional[list]) -> None:
+        """
+        Vermerkt eine erfolgreiche OOIR-Abfrage im Zeitplan und archiviert die Rangliste;
+        fehlgeschlagene Kategorien bleiben fällig.
+        """
+        if papers_data is not None:
+            slug = feed_slug(field_name, category_param)
+            self.scheduler.mark_refreshed(slug)
+            self._trend_stats[slug] = self.trend_archive.record(slug, papers_data)
+
+    def _trend_for(self, field_name: str, category_param: Optional[str], article: dict) -> Optional[TrendStats]:
+        return self._trend_stats.get(feed_slug(field_name, category_param), {}).get(article.get("doi", "N/A"))
+
+    def _entry_key(self, field_name: str, category_param: Optional[str], article: dict) -> EntryKey:
+        """
+        Schlüssel eines Items für Fingerabdruck und Wiederverwendung: (DOI, Rang, Score) und,
+        sofern archiviert, die im Item dargestellten Trend-Angaben. Diese sind bewusst auf
+        stabile Angaben beschränkt ('🆕' und erstmals gesehen), damit unveränderte Feeds
+        weiterhin übersprungen werden (siehe TrendStats.describe).
+        """
+        key = entry_key(article)
+        trend = self._trend_for(field_name, category_param, article)
+        if trend is not None:
+            key += (("🆕 " if trend.is_new else "") + trend.describe(),)
+        return key
+
+    def _fetch_article_metadata_from_doi(self, doi: str) -> Optional[ArticleRecord]:
         """
         Holt vollständige Artikelmetadaten (Titel, Autoren, Journal) von der Crossref API anhand der DOI.
+        Bereits bekannte DOIs (auch von Crossref als unbekannt gemeldete) werden aus dem Cache bedient.
         """
         if not doi or doi == "N/A":
             return None
 
-        crossref_url = f"https://api.crossref.org/works/{requests.utils.quote(doi)}"
-        print(f"DEBUG: Fetching metadata from Crossref API for DOI: {doi}")
+        found, cached_metadata = self.metadata_cache.get(doi)
+        if found:
+            return cached_metadata
+        return self._request_crossref_work(doi)
 
+    def _crossref_headers(self) -> Dict[str, str]:
         # Wichtig: Crossref empfiehlt, eine Kontakt-E-Mail im User-Agent anzugeben,
         # um im "Polite Pool" zu landen und höhere Rate Limits zu erhalten.
-        headers = {
+        return {
             "User-Agent": f"OOIR-RSS-Monitor/1.0 (mailto:{self.email})"
         }
 
+    def _request_crossref_work(self, doi: str) -> Optional[ArticleRecord]:
+        """Einzelabfrage '/works/{doi}' ohne Cache-Prüfung; das Ergebnis (auch 404) wird im Cache abgelegt."""
+        crossref_url = f"{self.crossref_api_url}/works/{requests.utils.quote(doi)}"
+        headers = self._crossref_headers()
+
         try:
-            response = requests.get(crossref_url, headers=headers, timeout=10)
+            self._crossref_limiter.acquire() # Gemeinsames Rate Limit für alle Worker-Threads (Polite Pool)
+            with self.metrics.stage("crossref_fetch"):
+                response = self.transport.get(crossref_url, headers=headers, timeout=10, cache_key=f"crossref:{doi}")
             response.raise_for_status()
             data = response.json()
             
             if data and data.get("status") == "ok" and "message" in data:
-                return data["message"]
+                # Sofort auf die dargestellten Felder reduzieren, die vollständige Antwort wird nicht aufbewahrt
+                record = ArticleRecord.from_crossref(data["message"])
+                self.metadata_cache.put(doi, record)
+                return record
             else:
                 print(f"WARNUNG: Crossref API lieferte keine Metadaten für DOI {doi}. Antwort: {data}")
                 return None
@@ -93,6 +279,8 @@ class OOIRTrendMonitor:
         except requests.exceptions.RequestException as e:
             print(f"FEHLER beim Abrufen von Metadaten von Crossref API für DOI {doi}: {e}")
             if hasattr(e, 'response') and e.response is not None:
+                if e.response.status_code == 404:
+                    self.metadata_cache.put_missing(doi) # DOI bei Crossref unbekannt, nicht bei jedem Lauf erneut anfragen
                 print(f"Crossref API-Antwort Status: {e.response.status_code}")
                 print(f"Crossref API-Antwort Text: {e.response.text}")
             return None
@@ -102,60 +290,180 @@ class OOIRTrendMonitor:
                  print(f"Rohe Crossref API-Antwort, die keine gültige JSON war: {response.text}")
             return None
 
-    def _create_rss_item(self, article: dict) -> ET.Element:
+    def _fetch_metadata_batch(self, dois: List[str]) -> Dict[str, ArticleRecord]:
+        """
+        Fragt mehrere DOIs mit einer gefilterten '/works'-Abfrage ab. Über 'select' liefert
+        Crossref nur die dargestellten Felder. Gefundene DOIs werden im Cache abgelegt.
+        Die DOIs werden sortiert, damit dieselbe Gruppe immer dieselbe Anfrage ergibt und
+        wie Einzelabfragen bedingt gestellt werden kann (Schlüssel: Hash der DOI-Liste).
+
+        Returns:
+            Dictionary DOI -> ArticleRecord für alle DOIs, die in der Antwort enthalten sind
+        """
+        dois = sorted(dois)
+        params = {
+            "filter": ",".join(f"doi:{doi}" for doi in dois),
+            "select": CROSSREF_SELECT_FIELDS,
+            "rows": len(dois),
+        }
+        cache_key = f"crossref-batch:{hashlib.sha256(params['filter'].encode('utf-8')).hexdigest()}"
+        try:
+            self._crossref_limiter.acquire()
+            with self.metrics.stage("crossref_fetch"):
+                response = self.transport.get(f"{self.crossref_api_url}/works", params=params,
+                                              headers=self._crossref_headers(), timeout=30, cache_key=cache_key)
+            self.metrics.increment("crossref_batch_requests")
+            response.raise_for_status()
+            items = response.json().get("message", {}).get("items", [])
+        except (requests.exceptions.RequestException, ValueError, AttributeError) as e:
+            print(f"WARNUNG: Crossref-Sammelabfrage für {len(dois)} DOIs fehlgeschlagen, Einzelabfragen folgen: {e}")
+            return {}
+
+        # Crossref vergleicht DOIs ohne Beachtung der Groß-/Kleinschreibung und liefert sie ggf. kleingeschrieben
+        requested = {doi.lower(): doi for doi in dois}
+        records = {}
+        for item in items:
+            doi = requested.get(str(item.get("DOI", "")).lower())
+            if doi is not None and doi not in records:
+                records[doi] = ArticleRecord.from_crossref(item)
+                self.metadata_cache.put(doi, records[doi])
+        return records
+
+    def _resolve_batch(self, dois: List[str]) -> Dict[str, Optional[ArticleRecord]]:
+        """Sammelabfrage mit Einzelabfragen für alle DOIs, die in der Antwort fehlen (z.B. 404-Kandidaten)."""
+        batchable = [doi for doi in dois if "," not in doi] # Kommas würden den Filter aufspalten
+        records: Dict[str, Optional[ArticleRecord]] = {}
+        if len(batchable) > 1:
+            records.update(self._fetch_metadata_batch(batchable))
+        for doi in dois:
+            if doi not in records:
+                if len(batchable) > 1:
+                    self.metrics.increment("crossref_batch_fallbacks")
+                records[doi] = self._request_crossref_work(doi)
+        return records
+
+    def resolve_metadata(self, dois: List[str]) -> Dict[str, Optional[ArticleRecord]]:
+        """
+        Liefert die Crossref-Metadaten für die übergebenen (eindeutigen) DOIs: zuerst aus dem Cache,
+        die übrigen in Sammelabfragen zu je crossref_batch_size DOIs, parallel über einen
+        begrenzten Thread-Pool.
+        """
+        metadata, missing = self._lookup_cached_metadata(dois)
+        if missing:
+            metadata.update(self._fetch_missing_metadata(missing))
+        return {doi: metadata.get(doi) for doi in dois}
+
+    def _lookup_cached_metadata(self, dois: List[str]) -> Tuple[Dict[str, Optional[ArticleRecord]], List[str]]:
+        """
+        Metadaten aus dem Journal eines fortgesetzten Laufs und dem DOI-Cache.
+
+        Returns:
+            Tupel (DOI -> ArticleRecord der gefundenen DOIs, nicht gefundene DOIs)
+        """
+        metadata: Dict[str, Optional[ArticleRecord]] = {}
+        missing = []
+        for doi in dois:
+            journaled = self.journal.metadata(doi) if self.journal is not None else None
+            if journaled is not None:
+                metadata[doi] = journaled
+                continue
+            found, record = self.metadata_cache.get(doi)
+            if found:
+                metadata[doi] = record
+            else:
+                missing.append(doi)
+        return metadata, missing
+
+    def _fetch_missing_metadata(self, dois: List[str]) -> Dict[str, Optional[ArticleRecord]]:
+        """Fragt nicht zwischengespeicherte DOIs in Sammelabfragen zu je crossref_batch_size DOIs ab."""
+        metadata: Dict[str, Optional[ArticleRecord]] = {}
+        batch_size = max(1, self.crossref_batch_size)
+        batches = [dois[start:start + batch_size] for start in range(0, len(dois), batch_size)]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as executor:
+            for records in executor.map(self._resolve_batch, batches):
+                metadata.update(records)
+                if self.journal is not None:
+                    # Nur gefundene Metadaten: fehlgeschlagene Abfragen werden beim Fortsetzen wiederholt
+                    self.journal.record_metadata({doi: record for doi, record in records.items() if record is not None})
+        return metadata
+
+    def enrich_articles(self, articles: Iterable[dict]) -> Dict[str, Optional[ArticleRecord]]:
+        """
+        Holt die Crossref-Metadaten für alle DOIs der übergebenen Artikel (siehe resolve_metadata).
+        Jede DOI wird nur einmal abgefragt.
+
+        Returns:
+            Dictionary DOI -> ArticleRecord mit den Crossref-Metadaten (None, falls nicht verfügbar)
+        """
+        dois = []
+        seen = set()
+        for article in articles:
+            doi = article.get("doi", "N/A")
+            if doi and doi != "N/A" and doi not in seen:
+                seen.add(doi)
+                dois.append(doi)
+
+        if not dois:
+            return {}
+        return self.resolve_metadata(dois)
+
+    def _create_rss_item(self, article: dict, crossref_metadata: Optional[ArticleRecord] = None,
+                         trend: Optional[TrendStats] = None) -> ET.Element:
         """
         Erstellt ein RSS-Item-Element aus einem Artikel-Dictionary, 
-        angereichert mit Daten von Crossref.
+        angereichert mit den vorab geladenen Daten von Crossref (siehe enrich_articles)
+        und den Trend-Angaben aus dem Archiv (neue Papers erhalten '🆕' im Titel).
         """
-        item = ET.Element("item")
+        return self._rss_item_from_record(self._build_item_record(article, crossref_metadata, trend))
 
+    def _build_item_record(self, article: dict, crossref_metadata: Optional[ArticleRecord] = None,
+                           trend: Optional[TrendStats] = None) -> dict:
+        """
+        Führt OOIR-, Crossref- und Trend-Angaben eines Artikels zu einem strukturierten,
+        JSON-serialisierbaren Datensatz zusammen. Daraus entstehen das RSS-Item
+        (_rss_item_from_record) und, mit json_feed, die Einträge in JSON Feed und NDJSON.
+        """
         doi = article.get("doi", "N/A")
-        crossref_metadata = None
-        if doi != "N/A":
-            crossref_metadata = self._fetch_article_metadata_from_doi(doi)
-            time.sleep(0.1) # Kurze Pause, um Crossref Rate Limits einzuhalten (Polite Pool)
 
         title_text = f"DOI: {doi} (Rank: {article.get('rank', 'N/A')})"
-        if crossref_metadata and "title" in crossref_metadata and crossref_metadata["title"]:
-            # Crossref Titel ist oft eine Liste, nehmen den ersten Eintrag
-            title_text = crossref_metadata["title"][0] if isinstance(crossref_metadata["title"], list) else crossref_metadata["title"]
-            title_text = re.sub(r'<[^>]*>', '', title_text) # HTML-Tags entfernen
-
-        title = ET.SubElement(item, "title")
-        title.text = title_text
+        if crossref_metadata and crossref_metadata.title is not None:
+            title_text = crossref_metadata.title # Bereits normalisiert (ArticleRecord.from_crossref)
 
-        link = ET.SubElement(item, "link")
-        if crossref_metadata and "URL" in crossref_metadata:
-            link.text = crossref_metadata["URL"] # Direktlink zum Artikel, falls von Crossref geliefert
+        if crossref_metadata and crossref_metadata.url is not None:
+            url = crossref_metadata.url # Direktlink zum Artikel, falls von Crossref geliefert
         elif doi != "N/A":
-            link.text = f"https://doi.org/{doi}" # Fallback auf DOI-Resolver
+            url = f"https://doi.org/{doi}" # Fallback auf DOI-Resolver
         else:
-            link.text = "https://ooir.org" # Letzter Fallback-Link
+            url = "https://ooir.org" # Letzter Fallback-Link
+
+        record = {
+            "guid": f"ooir-trend-{doi}-{article.get('day', '')}-{article.get('rank', '')}",
+            "doi": doi,
+            "title": title_text,
+            "url": url,
+            "field": article.get("field", "N/A"),
+            "category": article.get("category", "N/A"),
+            "score": article.get("score", "N/A"),
+            "rank": article.get("rank"),
+            "issn": article.get("issn", "N/A"),
+            "day": article.get("day", "N/A"),
+            "is_new": trend is not None and trend.is_new,
+            "trend": None,
+            "authors": [],
+            "journal": None,
+            "published": None,
+            "abstract": None,
+        }
+        if trend is not None:
+            record["trend"] = {"first_seen": trend.first_seen, "is_new": trend.is_new, "text": trend.describe()}
 
-        description = ET.SubElement(item, "description")
-        desc_parts = []
-        desc_parts.append(f"Feld: {article.get('field', 'N/A')}")
-        desc_parts.append(f"Kategorie: {article.get('category', 'N/A')}")
-        desc_parts.append(f"Score: {article.get('score', 'N/A')}")
-        
         if crossref_metadata:
-            if "author" in crossref_metadata:
-                authors = []
-                for author in crossref_metadata["author"]:
-                    if "given" in author and "family" in author:
-                        authors.append(f"{author['given']} {author['family']}")
-                    elif "name" in author: # Manchmal ist nur ein "name" Feld vorhanden
-                        authors.append(author["name"])
-                if authors:
-                    desc_parts.append(f"Autoren: {', '.join(authors)}")
-
-            if "container-title" in crossref_metadata and crossref_metadata["container-title"]:
-                journal_title = crossref_metadata["container-title"][0] if isinstance(crossref_metadata["container-title"], list) else crossref_metadata["container-title"]
-                desc_parts.append(f"Journal: {journal_title}")
+            record["authors"] = list(crossref_metadata.authors)
+            record["journal"] = crossref_metadata.journal
             
             # **FIX: Robusteres Parsen für published date-parts im Description-Feld**
-            if "published" in crossref_metadata and "date-parts" in crossref_metadata["published"]:
-                date_parts_pub = crossref_metadata["published"]["date-parts"][0]
+            if crossref_metadata.published is not None:
+                date_parts_pub = crossref_metadata.published
                 if date_parts_pub:
                     try:
                         year = date_parts_pub[0] if len(date_parts_pub) >= 1 else 1
@@ -170,29 +478,23 @@ class OOIRTrendMonitor:
                         if year < 1: year = 1
                         
                         pub_date_crossref = datetime.date(year, month, day)
-                        desc_parts.append(f"Veröffentlicht: {pub_date_crossref.strftime('%Y-%m-%d')}")
+                        record["published"] = pub_date_crossref.strftime('%Y-%m-%d')
                     except ValueError as e:
                         print(f"WARNUNG: Fehler beim Parsen des Crossref Published Datums für DOI {doi} (Beschreibung): {e}")
             
-            if "abstract" in crossref_metadata and crossref_metadata["abstract"]:
-                abstract_text = re.sub(r'<[^>]*>', '', crossref_metadata["abstract"]) # HTML-Tags entfernen
-                desc_parts.append(f"Abstract: {abstract_text}")
-        
-        desc_parts.append(f"DOI: {doi}")
-        desc_parts.append(f"ISSN: {article.get('issn', 'N/A')}")
-        desc_parts.append(f"Tag der Erhebung (OOIR): {article.get('day', 'N/A')}")
+            if crossref_metadata.abstract:
+                abstract_text = crossref_metadata.abstract # Bereits normalisiert (ArticleRecord.from_crossref)
+                if self.abstract_max_chars:
+                    truncated = truncate_text(abstract_text, self.abstract_max_chars)
+                    self.metrics.increment("abstract_chars_truncated", len(abstract_text) - len(truncated))
+                    abstract_text = truncated
+                record["abstract"] = abstract_text
 
-        description.text = "\n".join(desc_parts)
-        
-        guid = ET.SubElement(item, "guid")
-        guid.text = f"ooir-trend-{doi}-{article.get('day', '')}-{article.get('rank', '')}"
-        guid.set("isPermaLink", "false")
-
-        pub_date_str = None
+        published_at = None
         # **FIX: Robusteres Parsen für issued date-parts im pubDate-Feld**
-        if crossref_metadata and "issued" in crossref_metadata and "date-parts" in crossref_metadata["issued"]:
+        if crossref_metadata and crossref_metadata.issued is not None:
             try:
-                date_parts_issued = crossref_metadata["issued"]["date-parts"][0]
+                date_parts_issued = crossref_metadata.issued
                 year = date_parts_issued[0] if len(date_parts_issued) >= 1 else 1900
                 month = date_parts_issued[1] if len(date_parts_issued) >= 2 else 1
                 day = date_parts_issued[2] if len(date_parts_issued) >= 3 else 1
@@ -201,79 +503,317 @@ class OOIRTrendMonitor:
                 if not (1 <= month <= 12): month = 1
                 if not (1 <= day <= 31): day = 1
                 
-                dt_obj = datetime.datetime(year, month, day, tzinfo=datetime.timezone.utc)
-                pub_date_str = dt_obj.strftime("%a, %d %b %Y %H:%M:%S GMT")
+                published_at = datetime.datetime(year, month, day, tzinfo=datetime.timezone.utc)
             except Exception as e:
                 print(f"WARNUNG: Fehler beim Parsen des Crossref Issued Datums für DOI {doi}: {e}")
 
         # Fallback auf OOIR-Datum, wenn Crossref-Datum nicht verfügbar oder fehlerhaft
-        if not pub_date_str:
+        if not published_at:
             try:
                 date_str_ooir = article.get("day")
                 if date_str_ooir:
                     pub_datetime_ooir = datetime.datetime.strptime(date_str_ooir, "%Y-%m-%d")
-                    pub_date_str = pub_datetime_ooir.replace(tzinfo=datetime.timezone.utc).strftime("%a, %d %b %Y %H:%M:%S GMT")
+                    published_at = pub_datetime_ooir.replace(tzinfo=datetime.timezone.utc)
             except ValueError:
                 pass # OOIR Datum unvollständig oder fehlerhaft
         
         # Letzter Fallback auf aktuelle Zeit
-        if not pub_date_str:
-            pub_date_str = datetime.datetime.now(datetime.timezone.utc).strftime("%a, %d %b %Y %H:%M:%S GMT")
+        if not published_at:
+            published_at = datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0)
+
+        record["date_published"] = published_at.isoformat()
+        return record
 
-        pub_date = ET.SubElement(item, "pubDate")
-        pub_date.text = pub_date_str
+    @staticmethod
+    def _item_title(record: dict) -> str:
+        return f"🆕 {record['title']}" if record["is_new"] else record["title"]
+
+    @staticmethod
+    def _item_description(record: dict) -> str:
+        """Beschreibungstext des Items: alle Angaben des Datensatzes zeilenweise."""
+        desc_parts = []
+        desc_parts.append(f"Feld: {record['field']}")
+        desc_parts.append(f"Kategorie: {record['category']}")
+        desc_parts.append(f"Score: {record['score']}")
+        if record["trend"] is not None:
+            desc_parts.append(record["trend"]["text"])
+        if record["authors"]:
+            desc_parts.append(f"Autoren: {', '.join(record['authors'])}")
+        if record["journal"] is not None:
+            desc_parts.append(f"Journal: {record['journal']}")
+        if record["published"] is not None:
+            desc_parts.append(f"Veröffentlicht: {record['published']}")
+        if record["abstract"]:
+            desc_parts.append(f"Abstract: {record['abstract']}")
+        desc_parts.append(f"DOI: {record['doi']}")
+        desc_parts.append(f"ISSN: {record['issn']}")
+        desc_parts.append(f"Tag der Erhebung (OOIR): {record['day']}")
+        return "\n".join(desc_parts)
 
+    def _rss_item_from_record(self, record: dict) -> ET.Element:
+        item = ET.Element("item")
+        ET.SubElement(item, "title").text = self._item_title(record)
+        ET.SubElement(item, "link").text = record["url"]
+        ET.SubElement(item, "description").text = self._item_description(record)
+
+        guid = ET.SubElement(item, "guid")
+        guid.text = record["guid"]
+        guid.set("isPermaLink", "false")
+
+        published_at = datetime.datetime.fromisoformat(record["date_published"])
+        ET.SubElement(item, "pubDate").text = published_at.strftime("%a, %d %b %Y %H:%M:%S GMT")
         return item
 
-    def generate_rss_feed(self, full_category_name: str, field_name: str, category_param: Optional[str], papers_data: Optional[list]):
-        """Generiert einen RSS-Feed für eine bestimmte Kategorie mit den bereitgestellten Daten."""
-        rss = ET.Element("rss", version="2.0")
-        channel = ET.SubElement(rss, "channel")
+    def _plan_incremental_feed(self, full_category_name: str, field_name: str, category_param: Optional[str],
+                               papers_data: Optional[list]) -> Optional[Dict[EntryKey, ET.Element]]:
+        """
+        Vergleicht die aktuelle OOIR-Rangliste mit dem zuletzt geschriebenen Stand des Feeds.
+
+        Returns:
+            None, wenn der Feed unverändert ist (Anreicherung und Schreiben entfallen),
+            sonst die wiederverwendbaren Items des bisherigen Feeds je (DOI, Rang, Score)
+        """
+        filename_base = feed_slug(field_name, category_param)
+        filename = os.path.join(self.output_dir, f"{filename_base}.xml")
+        previous = self.feed_state.get(filename_base)
+        if previous is None or not os.path.exists(filename) or self.feed_state.render_options(filename_base) != self._render_options:
+            return {}
+
+        previous_fingerprint, previous_entries = previous
+        entries = [self._entry_key(field_name, category_param, article)
+                   for article in (papers_data or [])[:self._max_items_for(field_name, category_param)]]
+        if previous_fingerprint == feed_fingerprint(f"OOIR Trends: {full_category_name}", entries):
+            return None
+        if not previous_entries:
+            return {}
+        reusable_items = self._load_previous_items(filename_base, previous_entries)
+        if reusable_items and self.json_feed:
+            # Wiederverwendete Items brauchen auch ihren Datensatz, sonst wird der Feed vollständig neu erstellt
+            records = load_records(os.path.join(self.output_dir, f"{filename_base}.ndjson"))
+            if records is None or len(records) != len(previous_entries):
+                return {}
+            self._reusable_records[filename_base] = dict(zip(previous_entries, records))
+        return reusable_items
+
+    def _load_previous_items(self, filename_base: str, previous_entries: List[EntryKey]) -> Dict[EntryKey, ET.Element]:
+        """Liest die Items des zuletzt geschriebenen Feeds je Eintrag ({} wenn nicht lesbar oder abweichend)."""
+        filename = os.path.join(self.output_dir, f"{filename_base}.xml")
+        try:
+            previous_items = ET.parse(filename).getroot().findall("./channel/item")
+        except (OSError, ET.ParseError) as e:
+            print(f"WARNUNG: Bisheriger Feed '{filename}' nicht lesbar, alle Items werden neu erstellt: {e}")
+            return {}
+
+        if len(previous_items) != len(previous_entries):
+            return {}
+        return dict(zip(previous_entries, previous_items))
+
+    @staticmethod
+    def _is_new_item(item: ET.Element) -> bool:
+        return "🆕" in (item.findtext("title") or "")
+
+    def _open_feed_writer(self, filename: str) -> StreamingRSSWriter:
+        return StreamingRSSWriter(filename, indent="" if self.compact else "\t", metrics=self.metrics,
+                                  precompress=self.precompress)
+
+    def _write_channel_header(self, writer: StreamingRSSWriter, full_category_name: str) -> str:
+        """Schreibt die Kanal-Angaben eines Feeds und gibt den verwendeten Zeitstempel (GMT) zurück."""
+        writer.write_text_element("title", f"OOIR Trends: {full_category_name}")
+        writer.write_text_element("description", f"Aktuelle Paper-Trends im Bereich {full_category_name} von OOIR (mit Titel und Metadaten von Crossref)")
+        writer.write_text_element("link", "https://ooir.org")
+        writer.write_text_element("language", "en-us")
 
-        ET.SubElement(channel, "title").text = f"OOIR Trends: {full_category_name}"
-        ET.SubElement(channel, "description").text = f"Aktuelle Paper-Trends im Bereich {full_category_name} von OOIR (mit Titel und Metadaten von Crossref)"
-        ET.SubElement(channel, "link").text = "https://ooir.org"
-        ET.SubElement(channel, "language").text = "en-us"
-        
         current_time_gmt = datetime.datetime.now(datetime.timezone.utc).strftime("%a, %d %b %Y %H:%M:%S GMT")
-        ET.SubElement(channel, "pubDate").text = current_time_gmt
-        ET.SubElement(channel, "lastBuildDate").text = current_time_gmt
+        writer.write_text_element("pubDate", current_time_gmt)
+        writer.write_text_element("lastBuildDate", current_time_gmt)
+        return current_time_gmt
+
+    def _record_output(self, filename_base: str, writer: StreamingRSSWriter,
+                       structured_writer: Optional[StructuredFeedWriter] = None) -> Dict[str, int]:
+        """Überträgt die geschriebenen Bytes eines Feeds (auch vorkomprimiert und als JSON) in die Laufmetriken."""
+        self.metrics.increment("bytes_written", writer.bytes_written)
+        sizes = {"xml": writer.bytes_written}
+        extra_sizes = dict(writer.compressed_sizes)
+        if structured_writer is not None:
+            extra_sizes.update(structured_writer.bytes_written)
+        for suffix, size in extra_sizes.items():
+            sizes[suffix.lstrip(".")] = size
+            self.metrics.increment(f"bytes_written_{suffix.lstrip('.')}", size)
+        self.metrics.record_output(f"{filename_base}.xml", sizes)
+        return sizes
+
+    def generate_rss_feed(self, full_category_name: str, field_name: str, category_param: Optional[str], papers_data: Optional[list],
+                          metadata: Optional[Dict[str, Optional[ArticleRecord]]] = None,
+                          reusable_items: Optional[Dict[EntryKey, ET.Element]] = None):
+        """
+        Generiert einen RSS-Feed für eine bestimmte Kategorie mit den bereitgestellten Daten.
+        Ohne übergebene Metadaten werden die Crossref-Daten des Feeds über enrich_articles geladen.
+        Items aus reusable_items (siehe _plan_incremental_feed) werden unverändert übernommen.
+        """
+        reusable_items = reusable_items or {}
 
         articles_for_feed = []
         if papers_data: # papers_data ist jetzt direkt eine Liste von der OOIR API
-            articles_for_feed = papers_data[:self.max_items]
-
-        if not articles_for_feed:
-            error_item = ET.SubElement(channel, "item")
-            ET.SubElement(error_item, "title").text = f"⚠️ Keine Trends für {full_category_name} verfügbar"
-            ET.SubElement(error_item, "description").text = "Die OOIR-API lieferte keine Trend-Daten für diese Kategorie an diesem Tag."
-            ET.SubElement(error_item, "link").text = "https://ooir.org"
-            error_guid_base = f"ooir-no-trends-{re.sub(r'[^a-zA-Z0-9_]', '', field_name).lower()}"
-            if category_param:
-                error_guid_base += f"-{re.sub(r'[^a-zA-Z0-9_]', '', category_param).lower()}"
-            ET.SubElement(error_item, "guid").text = f"{error_guid_base}-{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}"
-            ET.SubElement(error_item, "pubDate").text = current_time_gmt
-        else:
-            for article in articles_for_feed:
-                channel.append(self._create_rss_item(article))
+            articles_for_feed = papers_data[:self._max_items_for(field_name, category_param)]
 
-        if category_param:
-            # Ersetzt ' ' durch '_' und entfernt alle Nicht-alphanumerischen Zeichen außer '_'
-            filename_base = f"{re.sub(r'[^a-zA-Z0-9_]', '', field_name.replace(' ', '_')).lower()}_{re.sub(r'[^a-zA-Z0-9_]', '', category_param.replace(' ', '_')).lower()}"
-        else:
-            filename_base = re.sub(r'[^a-zA-Z0-9_]', '', field_name.replace(' ', '_')).lower()
+        if articles_for_feed and metadata is None:
+            metadata = self.enrich_articles(article for article in articles_for_feed
+                                            if self._entry_key(field_name, category_param, article) not in reusable_items)
 
+        filename_base = feed_slug(field_name, category_param)
         filename = os.path.join(self.output_dir, f"{filename_base}.xml")
-        
-        tree = ET.ElementTree(rss)
-        ET.indent(tree, space="\t", level=0)
+        reusable_records = self._reusable_records.pop(filename_base, {})
+
+        structured_writer = None
+        if self.json_feed:
+            structured_writer = StructuredFeedWriter(
+                os.path.join(self.output_dir, filename_base), f"OOIR Trends: {full_category_name}",
+                f"Aktuelle Paper-Trends im Bereich {full_category_name} von OOIR (mit Titel und Metadaten von Crossref)",
+                compact=self.compact, metrics=self.metrics)
+
+        # Items werden einzeln erzeugt und sofort geschrieben, statt den ganzen Baum im Speicher aufzubauen
+        new_items = 0
+        with self._open_feed_writer(filename) as writer, structured_writer or contextlib.nullcontext():
+            current_time_gmt = self._write_channel_header(writer, full_category_name)
 
-        with open(filename, "wb") as f:
-            f.write(ET.tostring(rss, encoding="utf-8", xml_declaration=True))
+            if not articles_for_feed:
+                error_item = ET.Element("item")
+                ET.SubElement(error_item, "title").text = f"⚠️ Keine Trends für {full_category_name} verfügbar"
+                ET.SubElement(error_item, "description").text = "Die OOIR-API lieferte keine Trend-Daten für diese Kategorie an diesem Tag."
+                ET.SubElement(error_item, "link").text = "https://ooir.org"
+                error_guid_base = f"ooir-no-trends-{feed_slug(field_name, category_param)}"
+                ET.SubElement(error_item, "guid").text = f"{error_guid_base}-{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}"
+                ET.SubElement(error_item, "pubDate").text = current_time_gmt
+                writer.write_element(error_item)
+                items_written = 1
+            else:
+                feed_items = {}
+                if filename_base in self._aggregate_members:
+                    self._feed_items[filename_base] = feed_items
+                items_written = len(articles_for_feed)
+                for article in articles_for_feed:
+                    key = self._entry_key(field_name, category_param, article)
+                    item = reusable_items.get(key)
+                    record = reusable_records.get(key)
+                    if item is not None and (record is not None or structured_writer is None):
+                        self.items_reused += 1
+                    else:
+                        with self.metrics.stage("item_build"):
+                            record = self._build_item_record(article, metadata.get(article.get("doi", "N/A")),
+                                                             trend=self._trend_for(field_name, category_param, article))
+                            item = self._rss_item_from_record(record)
+                    writer.write_element(item)
+                    new_items += self._is_new_item(item)
+                    if structured_writer is not None:
+                        structured_writer.write_item(record, self._item_title(record), self._item_description(record))
+                    feed_items[key] = item
+
+        if structured_writer is None:
+            for suffix in STRUCTURED_SUFFIXES:
+                if os.path.exists(os.path.join(self.output_dir, filename_base + suffix)):
+                    os.remove(os.path.join(self.output_dir, filename_base + suffix)) # Veraltete JSON-Ausgabe eines früheren Laufs
+        sizes = self._record_output(filename_base, writer, structured_writer)
+        self.manifest.record_feed(f"{filename_base}.xml", full_category_name, field_name, category_param,
+                                  items=items_written, sizes=sizes, new_items=new_items, last_build=current_time_gmt)
         print(f"RSS Feed für '{full_category_name}' unter '{filename}' generiert.")
 
+        entries = [self._entry_key(field_name, category_param, article) for article in articles_for_feed]
+        self.feed_state.update(filename_base, feed_fingerprint(f"OOIR Trends: {full_category_name}", entries), entries,
+                               render_options=self._render_options)
+        self.feeds_rebuilt += 1
+        if self.journal is not None:
+            self.journal.record_feed(filename_base, {
+                "feed_state": self.feed_state.changes([filename_base]),
+                "schedule": self.scheduler.changes([filename_base]),
+                "manifest": self.manifest.changes([f"{filename_base}.xml"]),
+            })
+
+    def _aggregate_specs(self, categories: List[Tuple[str, str, Optional[str]]]) -> List[AggregateSpec]:
+        return aggregate_specs(categories) if self.aggregate_feeds else []
+
+    def _plan_aggregate_members(self, categories: List[Tuple[str, str, Optional[str]]]) -> None:
+        """Vermerkt die Feeds, deren Items generate_rss_feed für die Sammel-Feeds dieses Laufs behält."""
+        self._aggregate_members = {slug for spec in self._aggregate_specs(categories) for slug, _ in spec.members}
+
+    def generate_aggregate_feeds(self, categories: List[Tuple[str, str, Optional[str]]]):
+        """
+        Schreibt die Sammel-Feeds je Feld und über alle Kategorien (siehe aggregate_feeds.aggregate_specs).
+        Die Ranglisten stammen aus dem Feed-Status, die Items aus den in diesem Lauf geschriebenen
+        Feeds; nur Feeds, die in diesem Lauf nicht geschrieben wurden, werden dafür eingelesen.
+        Unveränderte Sammel-Feeds werden wie Einzel-Feeds übersprungen. Die Items eines Feeds werden
+        freigegeben, sobald der letzte Sammel-Feed mit diesem Feed geschrieben ist.
+        """
+        specs = self._aggregate_specs(categories)
+        pending_members = Counter(slug for spec in specs for slug, _ in spec.members)
+        for spec in specs:
+            self._write_aggregate_feed(spec)
+            for slug, _ in spec.members:
+                pending_members[slug] -= 1
+                if not pending_members[slug]:
+                    self._feed_items.pop(slug, None)
+        self._aggregate_members = set()
+
+    def _write_aggregate_feed(self, spec: AggregateSpec) -> None:
+        """Schreibt einen Sammel-Feed, sofern sich seine Rangliste oder die Darstellung geändert hat."""
+        member_names = dict(spec.members)
+        member_entries = []
+        for slug, _ in spec.members:
+            state = self.feed_state.get(slug)
+            if state is not None:
+                member_entries.append((slug, state[1]))
+        merged = merge_ranked(member_entries, self.aggregate_max_items)
+
+        title = f"OOIR Trends: {spec.name}"
+        entries = [(slug,) + entry for slug, entry in merged]
+        fingerprint = feed_fingerprint(title, entries)
+        filename = os.path.join(self.output_dir, f"{spec.slug}.xml")
+        previous = self.feed_state.get(spec.slug)
+        if (previous is not None and previous[0] == fingerprint and os.path.exists(filename)
+                and self.feed_state.render_options(spec.slug) == self._render_options):
+            self.feeds_skipped += 1
+            print(f"Sammel-Feed '{spec.name}' unverändert, wird übersprungen.")
+            return
+
+        member_items: Dict[str, Dict[EntryKey, ET.Element]] = {}
+        for slug, member_state in member_entries:
+            if slug not in self._feed_items:
+                self._feed_items[slug] = self._load_previous_items(slug, member_state)
+            member_items[slug] = self._feed_items[slug]
+
+        # Fehlende Items (Feed nicht lesbar) bleiben im Status unberücksichtigt, damit der nächste Lauf
+        # den Sammel-Feed nicht als unverändert überspringt
+        written_entries = []
+        new_items = 0
+        with self._open_feed_writer(filename) as writer:
+            current_time_gmt = self._write_channel_header(writer, spec.name)
+            for slug, entry in merged:
+                item = member_items[slug].get(entry)
+                if item is None:
+                    continue
+                # Flache Kopie: das Item des Einzel-Feeds bleibt unverändert
+                item = copy.copy(item)
+                ET.SubElement(item, "category").text = member_names[slug]
+                writer.write_element(item)
+                written_entries.append((slug,) + entry)
+                new_items += self._is_new_item(item)
+
+        items_written = len(written_entries)
+        if items_written < len(entries):
+            fingerprint = feed_fingerprint(title, written_entries)
+        sizes = self._record_output(spec.slug, writer)
+        self.manifest.record_feed(f"{spec.slug}.xml", spec.name, spec.field, None, items=items_written,
+                                  sizes=sizes, aggregate=True, new_items=new_items, last_build=current_time_gmt)
+        print(f"Sammel-Feed '{spec.name}' mit {items_written} Items aus {len(spec.members)} Feeds unter '{filename}' generiert.")
+        self.feed_state.update(spec.slug, fingerprint, written_entries, render_options=self._render_options)
+        self.feeds_rebuilt += 1
+
     def generate_index_html(self, categories: List[Tuple[str, str, Optional[str]]]):
-        """Generiert eine einfache index.html-Datei mit Links zu den RSS-Feeds."""
+        """
+        Generiert eine einfache index.html-Datei mit Links zu den RSS-Feeds. Die Kategorien
+        bestimmen zugleich, welche Feeds im Manifest als aktuell gelten (siehe FeedManifest).
+        """
+        aggregates = self._aggregate_specs(categories)
+        self.manifest.set_categories(categories, aggregates)
         html_content = f"""
         <!DOCTYPE html>
         <html lang="de">
@@ -298,13 +838,13 @@ class OOIRTrendMonitor:
 
         for full_name, field_name, category_param in categories:
             # Der Dateiname muss identisch mit dem in generate_rss_feed sein
-            if category_param:
-                filename = f"{re.sub(r'[^a-zA-Z0-9_]', '', field_name.replace(' ', '_')).lower()}_{re.sub(r'[^a-zA-Z0-9_]', '', category_param.replace(' ', '_')).lower()}.xml"
-            else:
-                filename = f"{re.sub(r'[^a-zA-Z0-9_]', '', field_name.replace(' ', '_')).lower()}.xml"
-            
+            filename = f"{feed_slug(field_name, category_param)}.xml"
+
             html_content += f'                <li><a href="{filename}">{full_name} RSS Feed</a></li>\n'
 
+        for spec in aggregates:
+            html_content += f'                <li><a href="{spec.slug}.xml">{spec.name} RSS Feed (Sammel-Feed)</a></li>\n'
+
         html_content += """
             </ul>
             <p>
@@ -315,42 +855,284 @@ class OOIRTrendMonitor:
         """
 
         index_html_path = os.path.join(self.output_dir, "index.html")
-        with open(index_html_path, "w", encoding="utf-8") as f:
+        if os.path.exists(index_html_path):
+            # Nur der Zeitstempel hat sich geändert: Datei nicht neu schreiben, um unnötige Commits zu vermeiden
+            with open(index_html_path, "r", encoding="utf-8") as f:
+                existing_content = f.read()
+            if _GENERATED_AT_PATTERN.sub("", existing_content) == _GENERATED_AT_PATTERN.sub("", html_content):
+                print(f"Index-Datei unter '{index_html_path}' unverändert.")
+                return
+
+        with self.metrics.stage("write"), open(index_html_path, "w", encoding="utf-8") as f:
             f.write(html_content)
+        self.metrics.increment("bytes_written", len(html_content.encode("utf-8")))
         print(f"Index-Datei unter '{index_html_path}' generiert.")
+
+    def run(self, categories: List[Tuple[str, str, Optional[str]]],
+            index_categories: Optional[List[Tuple[str, str, Optional[str]]]] = None):
+        """
+        Führt einen vollständigen Lauf aus: Zuerst werden die OOIR-Trends aller Kategorien
+        parallel geholt (ooir_workers, begrenzt durch ooir_rate und die Host-Parallelität),
+        danach die eindeutigen DOIs einmalig über Crossref angereichert und die Metadaten
+        an alle Feeds verteilt. Dieselbe DOI in mehreren Kategorien wird so nur einmal abgefragt.
+
+        Args:
+            categories: Die in diesem Lauf zu aktualisierenden Kategorien (z.B. die fälligen aus dem Zeitplan)
+            index_categories: Alle Kategorien für die Index-Seite, Standard ist categories
+        """
+        def fetch(category: Tuple[str, str, Optional[str]]):
+            full_name, field_name, category_param = category
+            papers_data = self.fetch_trends(field_name, category_param)
+            self._record_fetch(field_name, category_param, papers_data)
+            return full_name, field_name, category_param, papers_data
+
+        if self.shard is None:
+            self._plan_aggregate_members(index_categories or categories)
+        with ThreadPoolExecutor(max_workers=self.ooir_workers) as executor:
+            results = list(executor.map(fetch, categories))
+
+        feeds_to_build = []
+        for full_name, field_name, category_param, papers_data in results:
+            reusable_items = self._plan_incremental_feed(full_name, field_name, category_param, papers_data)
+            if reusable_items is None:
+                self.feeds_skipped += 1
+                print(f"RSS Feed für '{full_name}' unverändert, wird übersprungen.")
+                continue
+            feeds_to_build.append((full_name, field_name, category_param, papers_data, reusable_items))
+
+        feed_articles = [
+            article
+            for _, field_name, category_param, papers_data, reusable_items in feeds_to_build if papers_data
+            for article in papers_data[:self._max_items_for(field_name, category_param)]
+            if self._entry_key(field_name, category_param, article) not in reusable_items
+        ]
+        doi_references = sum(1 for article in feed_articles if article.get("doi", "N/A") not in (None, "", "N/A"))
+        metadata = self.enrich_articles(feed_articles)
+
+        for full_name, field_name, category_param, papers_data, reusable_items in feeds_to_build:
+            self.generate_rss_feed(full_name, field_name, category_param, papers_data, metadata=metadata, reusable_items=reusable_items)
+
+        if self.shard is None:
+            self.generate_aggregate_feeds(index_categories or categories)
+            self.generate_index_html(index_categories or categories)
+        self._print_run_summary(doi_references, len(metadata))
+
+    def run_async(self, categories: List[Tuple[str, str, Optional[str]]], queue_size: int = 4,
+                  index_categories: Optional[List[Tuple[str, str, Optional[str]]]] = None):
+        """
+        Wie run, aber als asyncio-Pipeline: OOIR-Abfragen, Crossref-Anreicherung und das
+        Schreiben der Feeds überlappen sich. Die erzeugten Dateien sind identisch zu run.
+        """
+        if self.shard is None:
+            self._plan_aggregate_members(index_categories or categories)
+        doi_references, unique_dois = asyncio.run(run_pipeline(self, categories, queue_size=queue_size))
+        if self.shard is None:
+            self.generate_aggregate_feeds(index_categories or categories)
+            self.generate_index_html(index_categories or categories)
+        self._print_run_summary(doi_references, unique_dois)
+
+    def write_feed_summary(self) -> None:
+        """Schreibt die Kennzahlen aller Feeds für 'feed_manager.py stats' (siehe feed_summary.py)."""
+        try:
+            write_summary(self.output_dir, self.manifest.feeds())
+        except OSError as e:
+            print(f"WARNUNG: Feed-Übersicht konnte nicht geschrieben werden: {e}")
+
+    def _journal_path(self) -> str:
+        name = "run_journal.jsonl" if self.shard is None else f"run_journal-shard-{self.shard[0]}-of-{self.shard[1]}.jsonl"
+        return os.path.join(self.output_dir, ".history", name)
+
+    def start_journal(self, categories: List[Tuple[str, str, Optional[str]]]) -> None:
+        """Beginnt das Journal dieses Laufs (siehe run_journal.py); es wird in close() gelöscht."""
+        self.journal = RunJournal(self._journal_path())
+        self.journal.start(categories, self._render_options)
+
+    def resume_journal(self) -> Optional[List[Tuple[str, str, Optional[str]]]]:
+        """
+        Setzt einen abgebrochenen Lauf fort: übernimmt die Änderungen bereits geschriebener Feeds
+        in Feed-Status, Zeitplan und Manifest. OOIR-Antworten und Crossref-Metadaten aus dem
+        Journal ersetzen im weiteren Lauf die API-Aufrufe.
+
+        Returns:
+            Die noch offenen Kategorien des abgebrochenen Laufs, None ohne fortsetzbares Journal
+        """
+        journal = RunJournal(self._journal_path())
+        if not journal.load(self._render_options):
+            return None
+        self.journal = journal
+        written_feeds = journal.written_feeds()
+        for changes in written_feeds.values():
+            self.feed_state.apply(changes.get("feed_state", {}))
+            self.scheduler.apply(changes.get("schedule", {}))
+            self.manifest.apply(changes.get("manifest", {}))
+        self.feeds_resumed = len(written_feeds)
+        return [category for category in journal.categories if feed_slug(category[1], category[2]) not in written_feeds]
+
+    def _print_run_summary(self, doi_references: int, unique_dois: int):
+        print(f"Feeds: {self.feeds_rebuilt} neu geschrieben, {self.feeds_skipped} unverändert übersprungen, "
+              f"{self.items_reused} Items wiederverwendet.")
+        if self.feeds_resumed:
+            print(f"Fortsetzung: {self.feeds_resumed} Feeds waren bereits vor dem Abbruch geschrieben.")
+        print(f"Crossref: {unique_dois} eindeutige DOIs für {doi_references} Feed-Einträge, "
+              f"{doi_references - unique_dois} Abfragen durch Deduplizierung eingespart.")
+        outputs = self.metrics.report()["outputs"]
+        xml_bytes = sum(sizes["xml"] for sizes in outputs.values())
+        for encoding in ("gz", "br"):
+            compressed = [sizes for sizes in outputs.values() if encoding in sizes]
+            if compressed and xml_bytes:
+                encoded_bytes = sum(sizes[encoding] for sizes in compressed)
+                source_bytes = sum(sizes["xml"] for sizes in compressed)
+                print(f"Vorkomprimiert ({encoding}): {len(compressed)} Feeds, {source_bytes} -> {encoded_bytes} Bytes "
+                      f"({1 - encoded_bytes / source_bytes:.0%} gespart, Details im Laufbericht unter 'outputs')")
+
+    def _collect_counters(self) -> None:
+        """Überträgt die Zähler von Feeds, HTTP-Schicht und DOI-Cache in die Laufmetriken."""
+        self.metrics.set("feeds_rebuilt", self.feeds_rebuilt)
+        self.metrics.set("feeds_skipped", self.feeds_skipped)
+        self.metrics.set("items_reused", self.items_reused)
+        if self.feeds_resumed:
+            self.metrics.set("feeds_resumed", self.feeds_resumed)
+        for counter in ("requests_sent", "retries", "throttled", "revalidated"):
+            self.metrics.set(f"http_{counter}", getattr(self.transport, counter))
+        for name, value in self.metadata_cache.stats().items():
+            self.metrics.set(f"doi_cache_{name}", value)
+
+    def write_report(self, report_path: Optional[str] = None, prometheus_path: Optional[str] = None) -> str:
+        """
+        Schreibt den JSON-Laufbericht (Standard '<output_dir>/.history/run_report.json')
+        und optional ein Prometheus-Textfile.
+
+        Returns:
+            Pfad des JSON-Laufberichts
+        """
+        report_path = report_path or os.path.join(self.output_dir, ".history", "run_report.json")
+        self._collect_counters()
+        self.metrics.write_json(report_path)
+        if prometheus_path:
+            self.metrics.write_prometheus(prometheus_path)
+        return report_path
+
+    def close(self, report_path: Optional[str] = None, prometheus_path: Optional[str] = None):
+        """
+        Speichert den Feed-Status, schließt Cache und HTTP-Verbindungen, gibt deren Statistik aus
+        und schreibt den Laufbericht. Im Shard-Modus werden Feed-Status, Zeitplan und Bericht
+        stattdessen in die Shard-Datei geschrieben (siehe sharding.merge_shards).
+        """
+        if self.shard is None:
+            self.feed_state.save()
+            self.scheduler.save()
+            self.manifest.save()
+            self.write_feed_summary()
+            if self.journal is not None:
+                self.journal.finish()
+        self.transport.close()
+        self.metadata_cache.close()
+        self.trend_archive.close()
+        cache_stats = self.metadata_cache.stats()
+        print(f"DOI-Cache: {cache_stats['hits']} Treffer, {cache_stats['negative_hits']} Negativ-Treffer, "
+              f"{cache_stats['misses']} Fehlschläge, {cache_stats['evictions']} verdrängt "
+              f"(Trefferquote {cache_stats['hit_rate']:.0%})")
+        print(f"HTTP: {self.transport.requests_sent} Anfragen, {self.transport.retries} Wiederholungen, "
+              f"{self.transport.throttled}x gedrosselt (429), {self.transport.revalidated} per 304 revalidiert statt neu geladen")
+        try:
+            if self.shard is None:
+                report_path = self.write_report(report_path, prometheus_path)
+            else:
+                report_path = write_shard_result(self, *self.shard)
+                if self.journal is not None:
+                    self.journal.finish()
+        except OSError as e:
+            print(f"WARNUNG: Laufbericht konnte nicht geschrieben werden: {e}")
+        else:
+            stages = ", ".join(f"{name} {stage['total_seconds']:.2f}s" for name, stage in self.metrics.report()["stages"].items())
+            print(f"Laufzeit: {stages or 'keine Stufen gemessen'} (Bericht: {report_path})")
         
-def main():
+def main(argv: Optional[List[str]] = None):
     """
     Hauptfunktion - Beispiel für die Verwendung
     """
+    parser = argparse.ArgumentParser(description="OOIR RSS Monitor")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Lauf als asyncio-Pipeline (OOIR, Crossref und Schreiben überlappend)")
+    parser.add_argument("--config", default=DEFAULT_CONFIG_PATH,
+                        help="JSON-Datei mit den überwachten Kategorien (Standard: categories.json neben diesem Skript)")
+    parser.add_argument("--all", action="store_true", help="Alle Kategorien abfragen, unabhängig vom Zeitplan")
+    parser.add_argument("--limit", type=int, help="Höchstens so viele fällige Kategorien pro Lauf (nach Priorität)")
+    parser.add_argument("--shard", type=parse_shard, metavar="i/N",
+                        help="Nur den i-ten von N Shards der Kategorien verarbeiten (z.B. als paralleler Job)")
+    parser.add_argument("--merge", action="store_true",
+                        help="Ergebnisse aller Shards zusammenführen: Index-Seite, Feed-Status, Zeitplan und Laufbericht")
+    parser.add_argument("--resume", action="store_true",
+                        help="Einen abgebrochenen Lauf fortsetzen: erledigte OOIR-Abfragen, Crossref-Metadaten und Feeds aus dem Journal übernehmen")
+    parser.add_argument("--compact", action="store_true", help="Feeds ohne Einrückung schreiben")
+    parser.add_argument("--precompress", action="store_true",
+                        help="Zusätzlich .xml.gz und (mit dem Paket 'brotli') .xml.br neben jedem Feed schreiben")
+    parser.add_argument("--no-aggregate", dest="aggregate", action="store_false",
+                        help="Keine Sammel-Feeds je Feld und über alle Kategorien schreiben")
+    parser.add_argument("--json-feed", action="store_true",
+                        help="Zusätzlich JSON Feed 1.1 (.json) und NDJSON (.ndjson) neben jedem Feed schreiben")
+    parser.add_argument("--abstract-chars", type=int, metavar="N", help="Abstracts auf N Zeichen kürzen")
+    parser.add_argument("--report", help="Pfad des JSON-Laufberichts (Standard: docs/.history/run_report.json)")
+    parser.add_argument("--prometheus", help="Zusätzlich ein Prometheus-Textfile schreiben (z.B. für den node_exporter)")
+    args = parser.parse_args(argv)
+
+    if args.merge and args.shard:
+        parser.error("--merge und --shard schließen sich aus")
+    if args.abstract_chars is not None and args.abstract_chars <= 0:
+        parser.error(f"--abstract-chars erwartet eine positive Zeichenzahl, nicht {args.abstract_chars}")
+
     EMAIL = os.getenv("OOIR_EMAIL")
     
-    if not EMAIL:
+    if not EMAIL and not args.merge:
         print("FEHLER: OOIR_EMAIL Umgebungsvariable nicht gesetzt. Kann nicht fortfahren.")
         return
 
-    monitor = OOIRTrendMonitor(email=EMAIL, output_dir="docs")
-
-    categories_to_monitor = [
-        ("Clinical Medicine (Rehabilitation)", "Clinical Medicine", "Rehabilitation"), # Relevant: FA Physical and Rehabilitative Medicine
-        ("Clinical Medicine (Orthopedics)", "Clinical Medicine", "Orthopedics"), # Relevant: Nichtoperative Orthopädie, Manuelle Medizin
-        ("Clinical Medicine (Sport Sciences)", "Clinical Medicine", "Sport Sciences"), # Relevant: Sportmedizin, Marathon
-        ("Clinical Medicine (Integrative & Complementary Medicine)", "Clinical Medicine", "Integrative & Complementary Medicine"), # Relevant: Akupunktur/Manuelle Medizin
-        ("Clinical Medicine (Medical Informatics)", "Clinical Medicine", "Medical Informatics"), # Relevant: Master Medizinische Informatik
-        ("Clinical Medicine (Medicine, General & Internal)", "Clinical Medicine", "Medicine, General & Internal"),
-        ("Clinical Medicine (Medicine, Research & Experimental)", "Clinical Medicine", "Medicine, Research & Experimental"),
-        ("Clinical Medicine (Nutrition & Dietetics)", "Clinical Medicine", "Nutrition & Dietetics"),
-        ("Clinical Medicine (Pharmacology & Pharmacy)", "Clinical Medicine", "Pharmacology & Pharmacy"),
-        ("Clinical Medicine (Rheumatology)", "Clinical Medicine", "Rheumatology"),
-        ("Clinical Medicine (Endocrinology & Metabolism)", "Clinical Medicine", "Endocrinology & Metabolism"),
-    ]
-    
-    for full_name, field_name, category_param in categories_to_monitor:
-        papers_data = monitor._fetch_data_from_api(field=field_name, category=category_param)
-        monitor.generate_rss_feed(full_name, field_name, category_param, papers_data)
-        time.sleep(1) # Kleine Pause zwischen den OOIR API-Aufrufen, um Server zu entlasten
+    try:
+        specs = load_categories(args.config)
+    except (OSError, ValueError) as e:
+        print(f"FEHLER: Kategorien aus '{args.config}' konnten nicht geladen werden: {e}")
+        return
+    all_categories = [spec.as_tuple() for spec in specs]
+
+    monitor = OOIRTrendMonitor(email=EMAIL or "", output_dir="docs", feed_max_items={spec.slug: spec.max_items for spec in specs},
+                               shard=args.shard, compact=args.compact, precompress=args.precompress,
+                               abstract_max_chars=args.abstract_chars, aggregate_feeds=args.aggregate,
+                               json_feed=args.json_feed)
+
+    if args.merge:
+        merged = merge_shards(monitor, all_categories, report_path=args.report, prometheus_path=args.prometheus)
+        monitor.transport.close()
+        monitor.metadata_cache.close()
+        monitor.trend_archive.close()
+        print(f"{merged} Shard(s) zusammengeführt, Index-Seite und Laufbericht erstellt.")
+        return
+
+    if args.shard:
+        specs = select_shard(specs, *args.shard)
+        print(f"Shard {args.shard[0]}/{args.shard[1]}: {len(specs)} Kategorien.")
+
+    categories_to_monitor = monitor.resume_journal() if args.resume else None
+    if categories_to_monitor is not None:
+        journal_stats = monitor.journal.stats
+        print(f"Fortsetzung: {len(categories_to_monitor)} von {len(monitor.journal.categories)} Kategorien offen, "
+              f"{journal_stats['ooir']} OOIR-Antworten und {journal_stats['metadata']} DOIs aus dem Journal.")
+    else:
+        if args.resume:
+            print("Kein fortsetzbarer Lauf gefunden, starte einen neuen Lauf.")
+        if args.all:
+            due_specs = specs[:args.limit] if args.limit is not None else specs
+        else:
+            due_specs = monitor.scheduler.due(specs, limit=args.limit)
+        print(f"Zeitplan: {len(due_specs)} von {len(specs)} Kategorien fällig.")
+
+        categories_to_monitor = [spec.as_tuple() for spec in due_specs]
+        monitor.start_journal(categories_to_monitor)
 
-    monitor.generate_index_html(categories_to_monitor)
+    if args.use_async:
+        monitor.run_async(categories_to_monitor, index_categories=all_categories)
+    else:
+        monitor.run(categories_to_monitor, index_categories=all_categories)
+    monitor.close(report_path=args.report, prometheus_path=args.prometheus)
 
     print("Alle RSS-Feeds und Index-Seite wurden generiert.")
 
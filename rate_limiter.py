@@ -0,0 +1,42 @@
+"""
+Rate Limiter
+Thread-sicherer Token-Bucket, um die Anfragerate an externe APIs zu begrenzen
+"""
+
+import threading
+import time
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """
+        Args:
+            rate: Nachgefüllte Tokens pro Sekunde (= erlaubte Anfragen pro Sekunde)
+            capacity: Maximale Anzahl an Tokens (= erlaubter Burst)
+        """
+        if rate <= 0:
+            raise ValueError("rate muss größer als 0 sein")
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """
+        Blockiert, bis die angeforderte Anzahl an Tokens verfügbar ist.
+        Kann gleichzeitig von mehreren Threads aufgerufen werden.
+        """
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait_time = (tokens - self._tokens) / self.rate
+            time.sleep(wait_time)
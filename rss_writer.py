@@ -0,0 +1,159 @@
+"""
+RSS Writer
+Schreibt RSS-Feeds inkrementell in eine temporäre Datei und ersetzt die Zieldatei
+erst nach erfolgreichem Abschluss atomar. Jedes Item wird direkt nach seiner
+Erstellung serialisiert, der Speicherbedarf bleibt unabhängig von der Anzahl der Items.
+Optional werden vorkomprimierte Geschwisterdateien ('.xml.gz', '.xml.br') im selben
+Durchgang erzeugt, damit der Webserver sie ohne Komprimierung zur Laufzeit ausliefern kann.
+"""
+
+import contextlib
+import os
+import tempfile
+import xml.etree.ElementTree as ET
+import zlib
+from typing import Dict, List, Optional
+
+from instrumentation import RunMetrics
+
+try:
+    import brotli
+except ImportError: # Optional: ohne das Paket 'brotli' werden nur .gz-Dateien erzeugt
+    brotli = None
+
+COMPRESSED_SUFFIXES = (".gz", ".br")
+
+
+class _CompressedSibling:
+    """Komprimiert den Datenstrom parallel zur XML-Datei in eine temporäre Geschwisterdatei."""
+
+    def __init__(self, path: str, suffix: str):
+        self.path = path + suffix
+        target_dir = os.path.dirname(os.path.abspath(self.path))
+        fd, self.tmp_path = tempfile.mkstemp(dir=target_dir, prefix=f".{os.path.basename(self.path)}.", suffix=".tmp")
+        self._file = os.fdopen(fd, "wb")
+        self.bytes_written = 0
+        if suffix == ".gz":
+            # wbits=31 erzeugt einen gzip-Header ohne Zeitstempel, gleiche Eingabe ergibt identische Dateien
+            compressor = zlib.compressobj(9, zlib.DEFLATED, 31)
+            self._process, self._finish = compressor.compress, compressor.flush
+        else:
+            compressor = brotli.Compressor(quality=11)
+            self._process, self._finish = compressor.process, compressor.finish
+
+    def write(self, data: bytes) -> None:
+        self._emit(self._process(data))
+
+    def _emit(self, chunk: bytes) -> None:
+        if chunk:
+            self._file.write(chunk)
+            self.bytes_written += len(chunk)
+
+    def commit(self, mtime_source: str) -> None:
+        self._emit(self._finish())
+        self._file.close()
+        os.chmod(self.tmp_path, 0o644)
+        os.replace(self.tmp_path, self.path)
+        stat = os.stat(mtime_source)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    def discard(self) -> None:
+        self._file.close()
+        os.remove(self.tmp_path)
+
+
+def _strip_whitespace(element: ET.Element) -> None:
+    """Entfernt reine Leerraum-Texte (z.B. aus einem eingelesenen, eingerückten Feed) für die kompakte Ausgabe."""
+    for node in element.iter():
+        if len(node) and node.text is not None and not node.text.strip():
+            node.text = None
+        if node.tail is not None and not node.tail.strip():
+            node.tail = None
+
+
+class StreamingRSSWriter:
+    def __init__(self, path: str, indent: str = "\t", metrics: Optional[RunMetrics] = None,
+                 precompress: bool = False):
+        """
+        Args:
+            path: Zielpfad der XML-Datei
+            indent: Einrückung pro Ebene (entspricht ET.indent(space=...)), "" für kompakte Ausgabe ohne Zeilenumbrüche
+            metrics: Misst die Stufen 'serialize' (ET.tostring) und 'write' (Dateizugriffe)
+            precompress: Zusätzlich '<path>.gz' und (falls 'brotli' installiert ist) '<path>.br' mit
+                         derselben mtime schreiben. Ohne precompress werden veraltete Geschwisterdateien entfernt.
+        """
+        self.path = path
+        self.indent = indent
+        self.metrics = metrics
+        self.precompress = precompress
+        self.bytes_written = 0
+        self._newline = "\n" if indent else ""
+        self._file = None
+        self._tmp_path: Optional[str] = None
+        self._siblings: List[_CompressedSibling] = []
+
+    @property
+    def compressed_sizes(self) -> Dict[str, int]:
+        """Größe der komprimierten Geschwisterdateien je Endung, z.B. {".gz": 1234}."""
+        return {sibling.path[len(self.path):]: sibling.bytes_written for sibling in self._siblings}
+
+    def _stage(self, name: str):
+        return self.metrics.stage(name) if self.metrics is not None else contextlib.nullcontext()
+
+    def __enter__(self) -> "StreamingRSSWriter":
+        target_dir = os.path.dirname(os.path.abspath(self.path))
+        fd, self._tmp_path = tempfile.mkstemp(dir=target_dir, prefix=f".{os.path.basename(self.path)}.", suffix=".tmp")
+        self._file = os.fdopen(fd, "wb")
+        if self.precompress:
+            self._siblings = [_CompressedSibling(self.path, suffix) for suffix in COMPRESSED_SUFFIXES
+                              if suffix != ".br" or brotli is not None]
+        self._write(f"<?xml version='1.0' encoding='utf-8'?>\n<rss version=\"2.0\">{self._newline}{self.indent}<channel>")
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is not None:
+            self._file.close()
+            os.remove(self._tmp_path)
+            for sibling in self._siblings:
+                sibling.discard()
+            return
+
+        self._write(f"{self._newline}{self.indent}</channel>{self._newline}</rss>")
+        with self._stage("write"):
+            self._file.close()
+            os.chmod(self._tmp_path, 0o644) # mkstemp legt die Datei nur für den Eigentümer lesbar an
+            os.replace(self._tmp_path, self.path)
+            for sibling in self._siblings:
+                sibling.commit(self.path)
+            if not self.precompress:
+                for suffix in COMPRESSED_SUFFIXES:
+                    if os.path.exists(self.path + suffix):
+                        os.remove(self.path + suffix) # Veraltete Kopie würde sonst statt des neuen Feeds ausgeliefert
+
+    def _write(self, text: str) -> None:
+        data = text.encode("utf-8")
+        with self._stage("write"):
+            self._file.write(data)
+            for sibling in self._siblings:
+                sibling.write(data)
+        self.bytes_written += len(data)
+
+    def write_element(self, element: ET.Element) -> None:
+        """
+        Schreibt ein direktes Kind von <channel> (z.B. <title> oder <item>) mit derselben
+        Einrückung, die ET.indent für den vollständigen Baum erzeugen würde.
+        """
+        with self._stage("serialize"):
+            element.tail = None
+            if self.indent:
+                ET.indent(element, space=self.indent, level=2)
+            else:
+                _strip_whitespace(element)
+            serialized = f"{self._newline}{self.indent * 2}" + ET.tostring(element, encoding="unicode")
+        self._write(serialized)
+
+    def write_text_element(self, tag: str, text: str) -> None:
+        """Schreibt ein einfaches Kanal-Element wie <title> oder <pubDate>."""
+        element = ET.Element(tag)
+        element.text = text
+        self.write_element(element)
@@ -0,0 +1,144 @@
+"""
+Run Journal
+Append-only Journal (JSON Lines) der abgeschlossenen Schritte eines Laufs: OOIR-Antwort je
+Kategorie, neu geladene Crossref-Metadaten und geschriebene Feeds samt ihrer Änderungen an
+Feed-Status, Zeitplan und Manifest. Bricht ein Lauf ab, setzt 'ooir_rss_monitor.py --resume'
+dort fort; bereits erledigte Abfragen und Feeds werden übersprungen. Nach einem erfolgreichen
+Lauf wird das Journal gelöscht.
+"""
+
+import datetime
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from article_record import ArticleRecord
+
+JOURNAL_VERSION = 1
+
+
+class RunJournal:
+    def __init__(self, journal_path: str):
+        """
+        Args:
+            journal_path: Pfad zur JSON-Lines-Datei, z.B. '<output_dir>/.history/run_journal.jsonl'
+        """
+        self.journal_path = journal_path
+        self.categories: List[Tuple[str, str, Optional[str]]] = []
+        self._trends: Dict[str, list] = {}
+        self._metadata: Dict[str, ArticleRecord] = {}
+        self._feeds: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._file = None
+
+    def start(self, categories: List[Tuple[str, str, Optional[str]]], render_options: str = "") -> None:
+        """Beginnt ein neues Journal für die Kategorien dieses Laufs (ein vorhandenes wird verworfen)."""
+        journal_dir = os.path.dirname(self.journal_path)
+        if journal_dir and not os.path.exists(journal_dir):
+            os.makedirs(journal_dir)
+        self.categories = list(categories)
+        self._file = open(self.journal_path, "w", encoding="utf-8")
+        self._append({
+            "type": "start",
+            "version": JOURNAL_VERSION,
+            "day": datetime.date.today().isoformat(),
+            "render": render_options,
+            "categories": [list(category) for category in self.categories],
+        })
+
+    def load(self, render_options: str = "") -> bool:
+        """
+        Liest das Journal eines abgebrochenen Laufs. Eine beim Abbruch unvollständig geschriebene
+        letzte Zeile wird ignoriert.
+
+        Returns:
+            True, wenn der Lauf fortgesetzt werden kann (Journal von heute mit denselben Ausgabe-Optionen)
+        """
+        try:
+            with open(self.journal_path, "rb") as f:
+                lines = f.readlines()
+        except OSError:
+            return False
+
+        header = None
+        valid_bytes = 0
+        for line in lines:
+            try:
+                if not line.endswith(b"\n"):
+                    raise ValueError("unvollständige Zeile")
+                entry = json.loads(line)
+            except ValueError:
+                break
+            valid_bytes += len(line)
+            if header is None:
+                header = entry
+                continue
+            if entry["type"] == "ooir":
+                self._trends[entry["feed"]] = entry["data"]
+            elif entry["type"] == "metadata":
+                self._metadata.update((doi, ArticleRecord.from_dict(data)) for doi, data in entry["records"].items())
+            elif entry["type"] == "feed":
+                self._feeds[entry["feed"]] = entry["changes"]
+
+        if header is None or header.get("type") != "start" or header.get("version") != JOURNAL_VERSION:
+            return False
+        if header["day"] != datetime.date.today().isoformat():
+            print(f"Journal vom {header['day']} ist veraltet, der Lauf beginnt neu.")
+            return False
+        if header.get("render", "") != render_options:
+            print("Journal wurde mit anderen Ausgabe-Optionen geschrieben, der Lauf beginnt neu.")
+            return False
+
+        self.categories = [tuple(category) for category in header["categories"]]
+        # Weitere Schritte werden an das bestehende Journal angehängt, eine unvollständige letzte Zeile wird abgeschnitten
+        with open(self.journal_path, "r+b") as f:
+            f.truncate(valid_bytes)
+        self._file = open(self.journal_path, "a", encoding="utf-8")
+        return True
+
+    def _append(self, entry: dict) -> None:
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush() # Nach einem Abbruch muss jeder abgeschlossene Schritt auf der Platte stehen
+
+    def trends(self, feed: str) -> Tuple[bool, Optional[list]]:
+        """(gefunden, OOIR-Rangliste) eines Feeds aus dem Journal."""
+        return (True, self._trends[feed]) if feed in self._trends else (False, None)
+
+    def record_trends(self, feed: str, papers_data: list) -> None:
+        self._trends[feed] = papers_data
+        self._append({"type": "ooir", "feed": feed, "data": papers_data})
+
+    def metadata(self, doi: str) -> Optional[ArticleRecord]:
+        return self._metadata.get(doi)
+
+    def record_metadata(self, records: Dict[str, ArticleRecord]) -> None:
+        if not records:
+            return
+        self._metadata.update(records)
+        self._append({"type": "metadata", "records": {doi: record.to_dict() for doi, record in records.items()}})
+
+    def written_feeds(self) -> Dict[str, dict]:
+        """Bereits geschriebene Feeds mit ihren Änderungen ({"feed_state": ..., "schedule": ..., "manifest": ...})."""
+        return dict(self._feeds)
+
+    def record_feed(self, feed: str, changes: dict) -> None:
+        self._feeds[feed] = changes
+        self._append({"type": "feed", "feed": feed, "changes": changes})
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {"ooir": len(self._trends), "metadata": len(self._metadata), "feeds": len(self._feeds)}
+
+    def finish(self) -> None:
+        """Schließt und löscht das Journal nach einem erfolgreichen Lauf."""
+        self.close()
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
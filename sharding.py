@@ -0,0 +1,115 @@
+"""
+Sharding
+Verteilt die Kategorien deterministisch auf N Shards, die als getrennte Prozesse oder
+Jobs laufen können. Jeder Shard schreibt nur seine Feeds und eine Shard-Datei mit den
+Änderungen an Feed-Status, Zeitplan und Manifest sowie seinem Laufbericht; der Merge-Schritt
+übernimmt diese in den gemeinsamen Stand und erzeugt Sammel-Feeds, Index-Seite und Gesamtbericht.
+"""
+
+import glob
+import hashlib
+import json
+import os
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
+
+from category_registry import CategorySpec
+from instrumentation import merge_reports, write_report_json, write_report_prometheus
+
+if TYPE_CHECKING:
+    from ooir_rss_monitor import OOIRTrendMonitor
+
+SHARD_DIR_NAME = "shards"
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """
+    Wertet eine Angabe der Form 'i/N' aus (i von 1 bis N).
+
+    Raises:
+        ValueError: bei ungültiger Angabe
+    """
+    try:
+        index_str, count_str = value.split("/", 1)
+        index, count = int(index_str), int(count_str)
+    except ValueError:
+        raise ValueError(f"Ungültige Shard-Angabe '{value}', erwartet 'i/N', z.B. '2/4'") from None
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Ungültige Shard-Angabe '{value}': 1 <= i <= N erwartet")
+    return index, count
+
+
+def shard_of(slug: str, count: int) -> int:
+    """
+    Shard (1 bis count) eines Feeds. Die Zuordnung hängt nur vom Feed-Namen ab und bleibt
+    daher stabil, wenn Kategorien in der Konfiguration ergänzt oder umsortiert werden.
+    """
+    digest = hashlib.sha1(slug.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+
+def select_shard(specs: Sequence[CategorySpec], index: int, count: int) -> List[CategorySpec]:
+    return [spec for spec in specs if shard_of(spec.slug, count) == index]
+
+
+def shard_path(state_dir: str, index: int, count: int) -> str:
+    return os.path.join(state_dir, SHARD_DIR_NAME, f"shard-{index}-of-{count}.json")
+
+
+def write_shard_result(monitor: "OOIRTrendMonitor", index: int, count: int) -> str:
+    """Schreibt Feed-Status-, Zeitplan- und Manifest-Änderungen sowie den Laufbericht eines Shards."""
+    path = shard_path(os.path.join(monitor.output_dir, ".history"), index, count)
+    monitor._collect_counters()
+    result = {
+        "shard": [index, count],
+        "feed_state": monitor.feed_state.changes(),
+        "schedule": monitor.scheduler.changes(),
+        "manifest": monitor.manifest.changes(),
+        "report": monitor.metrics.report(),
+    }
+    write_report_json(path, result)
+    return path
+
+
+def merge_shards(monitor: "OOIRTrendMonitor", categories: List[Tuple[str, str, Optional[str]]],
+                 report_path: Optional[str] = None, prometheus_path: Optional[str] = None) -> int:
+    """
+    Übernimmt alle Shard-Dateien in Feed-Status, Zeitplan und Manifest, erzeugt Sammel-Feeds
+    und Index-Seite für alle Kategorien und einen gemeinsamen Laufbericht. Verarbeitete Shard-Dateien werden gelöscht.
+
+    Returns:
+        Anzahl zusammengeführter Shards
+    """
+    paths = sorted(glob.glob(os.path.join(monitor.output_dir, ".history", SHARD_DIR_NAME, "shard-*-of-*.json")))
+    reports = []
+    shards = []
+    merged_paths = []
+    for path in paths:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"WARNUNG: Shard-Datei '{path}' nicht lesbar, wird übersprungen: {e}")
+            continue
+        monitor.feed_state.apply(result.get("feed_state", {}))
+        monitor.scheduler.apply(result.get("schedule", {}))
+        monitor.manifest.apply(result.get("manifest", {}))
+        reports.append(result["report"])
+        shards.append(result.get("shard"))
+        merged_paths.append(path)
+
+    monitor.generate_aggregate_feeds(categories)
+    monitor.generate_index_html(categories)
+    monitor.feed_state.save()
+    monitor.scheduler.save()
+    monitor.manifest.save()
+    monitor.write_feed_summary()
+
+    report = merge_reports(reports)
+    report["shards"] = shards
+    write_report_json(report_path or os.path.join(monitor.output_dir, ".history", "run_report.json"), report)
+    if prometheus_path:
+        write_report_prometheus(prometheus_path, report)
+
+    for path in merged_paths:
+        os.remove(path)
+    return len(reports)
@@ -0,0 +1,23 @@
+import datetime
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from category_registry import CategorySpec, RefreshScheduler  # noqa: E402
+
+DAILY = CategorySpec("Clinical Medicine (Rehabilitation)", "Clinical Medicine", "Rehabilitation", refresh_hours=24)
+MIDNIGHT = datetime.datetime(2024, 5, 2, 0, 0, tzinfo=datetime.timezone.utc)
+
+
+def test_due_after_late_previous_run(tmp_path):
+    # Lauf am Vortag 90 Minuten verspätet, heute pünktlich: nur 22,5 Stunden seit der letzten Abfrage
+    scheduler = RefreshScheduler(str(tmp_path / "schedule.json"))
+    scheduler.mark_refreshed(DAILY.slug, MIDNIGHT - datetime.timedelta(hours=22, minutes=30))
+    assert scheduler.due([DAILY], now=MIDNIGHT) == [DAILY]
+
+
+def test_not_due_when_refreshed_in_same_slot(tmp_path):
+    scheduler = RefreshScheduler(str(tmp_path / "schedule.json"))
+    scheduler.mark_refreshed(DAILY.slug, MIDNIGHT - datetime.timedelta(hours=2))
+    assert scheduler.due([DAILY], now=MIDNIGHT) == []
@@ -0,0 +1,37 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from trend_archive import TrendArchive  # noqa: E402
+
+FEED = "clinical_medicine_orthopedics"
+
+
+def _articles(day, *ranking):
+    return [{"doi": doi, "rank": rank, "score": 10 - rank, "day": day} for rank, doi in enumerate(ranking, start=1)]
+
+
+def test_latest_reports_days_trending_and_rank_delta(tmp_path):
+    archive = TrendArchive(str(tmp_path / "trend_archive.sqlite"))
+    archive.record(FEED, _articles("2024-05-01", "10.1/a", "10.1/b"))
+    archive.record(FEED, _articles("2024-05-02", "10.1/b", "10.1/a", "10.1/c"))
+
+    latest = archive.latest(FEED)
+    archive.close()
+
+    assert [doi for doi, _ in latest] == ["10.1/b", "10.1/a", "10.1/c"]
+    b, a, c = (stats for _, stats in latest)
+    assert (b.days_trending, b.rank_delta, b.is_new) == (2, 1, False)
+    assert (a.days_trending, a.rank_delta) == (2, -1)
+    assert (c.first_seen, c.days_trending, c.rank_delta, c.is_new) == ("2024-05-02", 1, None, True)
+
+
+def test_latest_skips_papers_no_longer_trending(tmp_path):
+    archive = TrendArchive(str(tmp_path / "trend_archive.sqlite"))
+    archive.record(FEED, _articles("2024-05-01", "10.1/a", "10.1/b"))
+    archive.record(FEED, _articles("2024-05-02", "10.1/b"))
+
+    assert [doi for doi, _ in archive.latest(FEED, limit=5)] == ["10.1/b"]
+    assert archive.latest("unknown_feed") == []
+    archive.close()
@@ -0,0 +1,82 @@
+"""
+Text Normalization
+Vorkompilierte Muster für Titel, Abstracts (HTML/JATS aus Crossref) und Feed-Dateinamen
+"""
+
+import functools
+import html
+import re
+from typing import Optional, Tuple
+
+# Ein Durchlauf für alle Tags: Block-Elemente (auch mit JATS/MathML-Präfix, Gruppe "block") werden
+# durch ein Leerzeichen ersetzt, damit z.B. "<jats:title>Abstract</jats:title><jats:p>Text" nicht zu
+# "AbstractText" verschmilzt, alle übrigen (Inline-)Tags wie <i> oder <sub> werden ersatzlos entfernt
+_MARKUP_PATTERN = re.compile(
+    r"<(?:(?P<block>/?(?:jats:|mml:)?(?:p|br|div|li|title|sec|list|list-item|break|disp-quote|label)(?=[\s/>]))[^>]*|[^>]*)>"
+)
+_SLUG_PATTERN = re.compile(r"[^a-zA-Z0-9_]")
+_LEGACY_COMPACT_PATTERN = re.compile(r"[^a-z0-9]")
+
+
+def _replace_tag(match: "re.Match[str]") -> str:
+    return " " if match.lastindex else ""
+
+
+def strip_markup(text: str) -> str:
+    """
+    Entfernt HTML- und JATS-Tags, löst HTML-Entities auf (&amp;, &lt;, &#8211; ...)
+    und fasst Leerraum zusammen. Text ohne '<' und '&' bleibt unverändert.
+    """
+    if not text or ("<" not in text and "&" not in text):
+        return text or ""
+    if "<" in text:
+        text = _MARKUP_PATTERN.sub(_replace_tag, text)
+    # Entities erst nach dem Entfernen der Tags auflösen, damit maskierte Tags als Text erhalten bleiben
+    if "&" in text:
+        text = html.unescape(text)
+    return " ".join(text.split())
+
+
+def truncate_text(text: str, max_chars: Optional[int]) -> str:
+    """
+    Kürzt text auf höchstens max_chars Zeichen (einschließlich '…'), möglichst an einer Wortgrenze.
+    Ohne max_chars bleibt der Text unverändert.
+    """
+    if not max_chars or len(text) <= max_chars:
+        return text
+    cut = text[:max_chars - 1]
+    space = cut.rfind(" ")
+    if space > max_chars // 2:
+        cut = cut[:space]
+    return cut.rstrip(" ,;:.") + "…"
+
+
+@functools.lru_cache(maxsize=1024)
+def slugify(value: str) -> str:
+    """Ersetzt ' ' durch '_' und entfernt alle Nicht-alphanumerischen Zeichen außer '_'."""
+    return _SLUG_PATTERN.sub("", value.replace(" ", "_")).lower()
+
+
+def feed_slug(field_name: str, category_param: Optional[str] = None) -> str:
+    """
+    Kanonischer Dateiname (ohne Endung) eines Feeds, z.B.
+    ("Clinical Medicine", "Nutrition & Dietetics") -> "clinical_medicine_nutrition__dietetics".
+    """
+    if category_param:
+        return f"{slugify(field_name)}_{slugify(category_param)}"
+    return slugify(field_name)
+
+
+def legacy_feed_slugs(field_name: str, category_param: Optional[str] = None) -> Tuple[str, ...]:
+    """
+    Dateinamen (ohne Endung), unter denen frühere Versionen denselben Feed geschrieben haben, z.B.
+    ("Clinical Medicine", "Nutrition & Dietetics") -> ("clinicalmedicine_nutritiondietetics",
+    "clinical_medicine_nutrition_and_dietetics"). Der kanonische Name (feed_slug) ist nicht enthalten.
+    """
+    parts = [field_name] + ([category_param] if category_param else [])
+    variants = (
+        "_".join(_LEGACY_COMPACT_PATTERN.sub("", part.lower()) for part in parts),
+        "_".join(slugify(part.replace("&", "and")) for part in parts),
+    )
+    canonical = feed_slug(field_name, category_param)
+    return tuple(dict.fromkeys(variant for variant in variants if variant != canonical))
@@ -0,0 +1,202 @@
+"""
+Trend Archive
+Indiziertes SQLite-Archiv aller OOIR-Ranglisten (Feed, Tag, DOI, Rang, Score).
+Eine mitgeführte Zusammenfassung je (Feed, DOI) beantwortet "erstmals gesehen",
+"Tage im Trend" und "Rangänderung seit gestern" mit einem Primärschlüssel-Zugriff,
+unabhängig davon, wie viele Jahre das Archiv umfasst.
+"""
+
+import datetime
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+
+class TrendStats(NamedTuple):
+    first_seen: str
+    days_trending: int
+    rank: Optional[int]
+    rank_delta: Optional[int]
+    is_new: bool
+
+    def describe(self) -> str:
+        """
+        Zeile für die Item-Beschreibung, z.B. 'Im Trend seit: 2024-05-01'. Tage im Trend und
+        Rangänderung ändern sich täglich und stehen deshalb nicht im Item, sonst würde jeder
+        Feed täglich neu geschrieben (siehe OOIRTrendMonitor._entry_key).
+        """
+        return f"Im Trend seit: {self.first_seen}"
+
+
+def _as_int(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _as_float(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _previous_day(day: str) -> Optional[str]:
+    try:
+        return (datetime.date.fromisoformat(day) - datetime.timedelta(days=1)).isoformat()
+    except ValueError:
+        return None
+
+
+class TrendArchive:
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path: Pfad zur SQLite-Datei, z.B. '<output_dir>/.history/trend_archive.sqlite'
+        """
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS rankings (
+                feed TEXT NOT NULL,
+                day TEXT NOT NULL,
+                doi TEXT NOT NULL,
+                rank INTEGER,
+                score REAL,
+                PRIMARY KEY (feed, day, doi)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_rankings_doi_day ON rankings (doi, day);
+            CREATE TABLE IF NOT EXISTS trend_summary (
+                feed TEXT NOT NULL,
+                doi TEXT NOT NULL,
+                first_seen TEXT NOT NULL,
+                last_seen TEXT NOT NULL,
+                days_trending INTEGER NOT NULL,
+                last_rank INTEGER,
+                prev_day TEXT,
+                prev_rank INTEGER,
+                PRIMARY KEY (feed, doi)
+            ) WITHOUT ROWID;
+        """)
+        self._conn.commit()
+
+    def record(self, feed: str, articles: Iterable[dict], default_day: Optional[str] = None) -> Dict[str, TrendStats]:
+        """
+        Archiviert die Rangliste eines Feeds (Tag aus dem Feld 'day' der OOIR-Daten, sonst default_day)
+        und gibt die aktualisierten Kennzahlen je DOI zurück. Ein erneuter Lauf am selben Tag
+        überschreibt Rang und Score, zählt den Tag aber nicht doppelt.
+
+        Papers gelten nur dann als neu (is_new), wenn der Feed bereits an früheren Tagen archiviert
+        wurde, damit der erste Lauf mit leerem Archiv nicht jedes Paper als neu markiert.
+        """
+        default_day = default_day or datetime.date.today().isoformat()
+        rows: List[Tuple[str, str, Optional[int], Optional[float]]] = []
+        seen = set()
+        for article in articles:
+            doi = article.get("doi")
+            if not doi or doi == "N/A" or doi in seen:
+                continue
+            seen.add(doi)
+            rows.append((str(article.get("day") or default_day), doi, _as_int(article.get("rank")), _as_float(article.get("score"))))
+        if not rows:
+            return {}
+
+        with self._lock, self._conn:
+            earliest_day = min(day for day, _, _, _ in rows)
+            feed_known = self._conn.execute(
+                "SELECT 1 FROM rankings WHERE feed = ? AND day < ? LIMIT 1", (feed, earliest_day)
+            ).fetchone() is not None
+
+            for day, doi, rank, score in rows:
+                new_day = self._conn.execute(
+                    "INSERT OR IGNORE INTO rankings (feed, day, doi, rank, score) VALUES (?, ?, ?, ?, ?)",
+                    (feed, day, doi, rank, score)
+                ).rowcount == 1
+                if not new_day:
+                    self._conn.execute(
+                        "UPDATE rankings SET rank = ?, score = ? WHERE feed = ? AND day = ? AND doi = ?",
+                        (rank, score, feed, day, doi)
+                    )
+                # Alle Ausdrücke im SET-Teil beziehen sich auf die Werte vor der Änderung
+                self._conn.execute("""
+                    INSERT INTO trend_summary (feed, doi, first_seen, last_seen, days_trending, last_rank)
+                    VALUES (?, ?, ?, ?, 1, ?)
+                    ON CONFLICT (feed, doi) DO UPDATE SET
+                        first_seen = MIN(first_seen, excluded.first_seen),
+                        days_trending = days_trending + ?,
+                        prev_day = CASE WHEN excluded.last_seen > last_seen THEN last_seen ELSE prev_day END,
+                        prev_rank = CASE WHEN excluded.last_seen > last_seen THEN last_rank ELSE prev_rank END,
+                        last_rank = CASE WHEN excluded.last_seen >= last_seen THEN excluded.last_rank ELSE last_rank END,
+                        last_seen = MAX(last_seen, excluded.last_seen)
+                """, (feed, doi, day, day, rank, int(new_day)))
+
+        stats = {}
+        for _, doi, _, _ in rows:
+            doi_stats = self.lookup(feed, doi, feed_known=feed_known)
+            if doi_stats is not None:
+                stats[doi] = doi_stats
+        return stats
+
+    def lookup(self, feed: str, doi: str, feed_known: bool = True) -> Optional[TrendStats]:
+        """Kennzahlen einer DOI in einem Feed über den Primärschlüssel der Zusammenfassung."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT first_seen, last_seen, days_trending, last_rank, prev_day, prev_rank "
+                "FROM trend_summary WHERE feed = ? AND doi = ?", (feed, doi)
+            ).fetchone()
+        if row is None:
+            return None
+        return self._stats_from_row(row, feed_known)
+
+    def latest(self, feed: str, limit: Optional[int] = None) -> List[Tuple[str, TrendStats]]:
+        """
+        Kennzahlen der DOIs aus der zuletzt archivierten Rangliste eines Feeds, nach Rang sortiert.
+        Tage im Trend und Rangänderung stehen nicht in den Feeds (siehe TrendStats.describe),
+        sind aber hierüber abrufbar, z.B. mit 'feed_manager.py trends'.
+
+        Returns:
+            Liste aus (DOI, Kennzahlen), leer wenn der Feed nicht archiviert ist
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT doi, first_seen, last_seen, days_trending, last_rank, prev_day, prev_rank "
+                "FROM trend_summary WHERE feed = ? AND last_seen = (SELECT MAX(last_seen) FROM trend_summary WHERE feed = ?) "
+                "ORDER BY last_rank IS NULL, last_rank, doi LIMIT ?", (feed, feed, -1 if limit is None else limit)
+            ).fetchall()
+            feed_known = bool(rows) and self._conn.execute(
+                "SELECT 1 FROM rankings WHERE feed = ? AND day < ? LIMIT 1", (feed, rows[0][2])
+            ).fetchone() is not None
+        return [(row[0], self._stats_from_row(row[1:], feed_known)) for row in rows]
+
+    @staticmethod
+    def _stats_from_row(row: tuple, feed_known: bool) -> TrendStats:
+        first_seen, last_seen, days_trending, last_rank, prev_day, prev_rank = row
+        rank_delta = None
+        if prev_day is not None and prev_rank is not None and last_rank is not None and prev_day == _previous_day(last_seen):
+            rank_delta = prev_rank - last_rank # Positiv: im Ranking aufgestiegen
+        return TrendStats(
+            first_seen=first_seen,
+            days_trending=days_trending,
+            rank=last_rank,
+            rank_delta=rank_delta,
+            is_new=feed_known and days_trending == 1,
+        )
+
+    def history(self, doi: str) -> List[Tuple[str, str, Optional[int], Optional[float]]]:
+        """Zeitreihe einer DOI über alle Feeds: Liste aus (Tag, Feed, Rang, Score), nach Tag sortiert."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT day, feed, rank, score FROM rankings WHERE doi = ? ORDER BY day, feed", (doi,)
+            ).fetchall()
+
+    def close(self) -> None:
+        self._conn.close()